@@ -1,15 +1,22 @@
 import os
 import uuid
-from typing import List, Dict, TypedDict, Annotated, Optional
+import json
+import hashlib
+import threading
+from typing import List, Dict, Tuple, TypedDict, Annotated, Optional
 import numpy as np
 from dotenv import load_dotenv
-import mysql.connector
 from mysql.connector import Error
 
+from db import get_connection
+from embedding_store import EmbeddingStore, QueryEmbeddingCache, LocalHashEmbeddings
+from vector_index import build_vector_index
+
 # LangChain imports
-from langchain_core.messages import BaseMessage, HumanMessage, AIMessage, SystemMessage
+from langchain_core.messages import BaseMessage, HumanMessage, AIMessageChunk, SystemMessage, ToolMessage
 from langchain_openai import ChatOpenAI, OpenAIEmbeddings
 from langchain_core.tools import tool
+from langchain_core.runnables import RunnableConfig
 from langchain_core.tracers import LangChainTracer
 from langchain_core.callbacks import CallbackManager
 
@@ -32,74 +39,211 @@ except ImportError:
 load_dotenv()
 
 
-class CareerBotRAG:
-    """AI-Powered Youth Employment & Career Roadmap Platform with Streaming, Memory, and Personalization."""
+class KnowledgeIndex:
+    """
+    Read-only retrieval index over the career knowledge base.
+    
+    Built once per process and shared by every CareerBotRAG instance, so the
+    chunks and their embedding matrix exist in memory only once.
+    """
     
-    def __init__(self, knowledge_base_path: str = "knowledge_base.txt", user_id: Optional[int] = None, user_profile: Optional[Dict] = None):
+    def __init__(self, knowledge_base_path: str, embedding_model):
         """
-        Initialize the Career Bot with RAG capabilities, streaming, and memory.
+        Load, chunk and embed the knowledge base.
         
         Args:
             knowledge_base_path: Path to the knowledge base text file
-            user_id: Optional user ID to fetch personalized skills from database
-            user_profile: Optional comprehensive user profile data from backend
+            embedding_model: Model providing embed_documents/embed_query
         """
-        print("🚀 Initializing AI-Powered Career Bot with Streaming & Memory...")
-        print("="*70)
+        self.embedding_model = embedding_model
         
-        # Store user ID and profile for personalization
-        self.user_id = user_id
-        self.user_profile = user_profile or {}
-        self.user_skills = []
+        # Persistent embedding cache keyed by model + chunk content
+        cache_dir = os.getenv("EMBEDDING_CACHE_DIR") or os.path.join(
+            os.path.dirname(os.path.abspath(knowledge_base_path)), ".embedding_cache"
+        )
+        self.embedding_store = EmbeddingStore(cache_dir, embedding_model.model)
         
-        # Initialize thread ID for conversation memory
-        self.thread_id = str(uuid.uuid4())
-        print(f"🔗 Thread ID: {self.thread_id}")
+        # Repeated questions skip the embedding round trip entirely
+        persist_queries = os.getenv("QUERY_CACHE_PERSIST", "false").lower() == "true"
+        self.query_cache = QueryEmbeddingCache(
+            embedding_model.model,
+            max_entries=int(os.getenv("QUERY_CACHE_SIZE", "4096")),
+            disk_path=os.path.join(self.embedding_store.directory, "queries.sqlite3") if persist_queries else None
+        )
+        
+        # Load and process knowledge base
+        print("\n📖 Loading Career & Employment Knowledge Base...")
+        self.chunks = self._load_and_chunk_knowledge_base(knowledge_base_path)
+        print(f"✓ Loaded {len(self.chunks)} career guidance chunks")
+        
+        # Create embeddings for new or changed chunks only, stored unit-length so
+        # cosine similarity is a single matrix product at query time
+        print("\n🔢 Loading knowledge base embeddings...")
+        self.embeddings = self._normalize(self._create_embeddings(self.chunks))
+        print(f"✓ Knowledge base embeddings ready ({self.embedding_store.last_hits} cached, "
+              f"{self.embedding_store.last_misses} newly embedded, "
+              f"{self.embedding_store.last_pruned} stale dropped)")
+        
+        # Exact search for small corpora, IVF ANN (persisted next to the
+        # embedding cache) once the corpus grows; see vector_index.py
+        fingerprint = hashlib.sha256(
+            "\n".join(self.embedding_store.key(chunk) for chunk in self.chunks).encode("utf-8")
+        ).hexdigest()
+        self.vector_index = build_vector_index(self.embeddings, fingerprint, self.embedding_store.directory)
+        print(f"✓ Vector index ready ({self.vector_index.kind})")
+    
+    def _load_and_chunk_knowledge_base(self, file_path: str) -> List[str]:
+        """
+        Load and chunk the knowledge base file.
+        
+        Args:
+            file_path: Path to the knowledge base file
+            
+        Returns:
+            List of text chunks (Q&A pairs)
+        """
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"Knowledge base file not found: {file_path}")
+        
+        with open(file_path, 'r', encoding='utf-8') as f:
+            content = f.read()
+        
+        # Split by Q: to get individual Q&A pairs
+        chunks = []
+        parts = content.split('Q: ')
+        
+        for part in parts:
+            if part.strip():
+                chunk = 'Q: ' + part.strip()
+                chunks.append(chunk)
+        
+        return chunks
+    
+    def _create_embeddings(self, texts: List[str]) -> np.ndarray:
+        """
+        Create embeddings, reusing cached vectors for unchanged texts.
+        
+        Args:
+            texts: List of text strings to embed
+        
+        Returns:
+            Numpy array of embeddings
+        """
+        # Only texts missing from the on-disk store reach the embedding model; texts is
+        # the whole knowledge base, so rows of removed or edited chunks are compacted away
+        return self.embedding_store.get_or_embed(texts, self.embedding_model.embed_documents, prune=True)
+    
+    @staticmethod
+    def _normalize(vectors) -> np.ndarray:
+        """
+        L2-normalize rows into a C-contiguous float32 matrix (zero rows stay zero).
+        """
+        matrix = np.ascontiguousarray(vectors, dtype=np.float32)
+        if matrix.ndim == 1:
+            matrix = matrix.reshape(1, -1)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return np.ascontiguousarray(matrix / norms, dtype=np.float32)
+    
+    def embed_queries(self, queries: List[str]) -> np.ndarray:
+        """
+        Embed queries into a normalized (len(queries), dim) float32 matrix.
+        """
+        return self._normalize(self.query_cache.get_or_embed(list(queries), self._embed_uncached))
+    
+    def _embed_uncached(self, queries: List[str]) -> List[List[float]]:
+        """Embed queries that missed the query cache."""
+        if len(queries) == 1:
+            return [self.embedding_model.embed_query(queries[0])]
+        # One batched request instead of one round trip per query
+        return self.embedding_model.embed_documents(queries)
+    
+    def stats(self) -> Dict:
+        """Vector index and query cache metrics."""
+        return {
+            "chunks": len(self.chunks),
+            "vector_index": self.vector_index.stats(),
+            "query_cache": self.query_cache.stats()
+        }
+    
+    def search_vectors(self, query_vectors: np.ndarray, top_k: int = 3) -> List[List[Tuple[int, float]]]:
+        """
+        Rank chunks for normalized query vectors.
+        
+        Args:
+            query_vectors: (n_queries, dim) unit-length float32 matrix
+            top_k: Number of top chunks per query
+        
+        Returns:
+            Per query, a list of (chunk index, cosine similarity), best first
+        """
+        return self.vector_index.search(query_vectors, top_k)
+    
+    def search_many(self, queries: List[str], top_k: int = 3) -> List[List[Tuple[int, float]]]:
+        """
+        Find the chunks most similar to each of several queries.
+        
+        Args:
+            queries: User questions
+            top_k: Number of top chunks per query
+        
+        Returns:
+            Per query, a list of (chunk index, cosine similarity), best first
+        """
+        if not queries:
+            return []
+        return self.search_vectors(self.embed_queries(queries), top_k)
+    
+    def search(self, query: str, top_k: int = 3) -> List[Tuple[int, float]]:
+        """
+        Find the chunks most similar to a query.
+        
+        Args:
+            query: User's question
+            top_k: Number of top chunks to retrieve
+        
+        Returns:
+            List of (chunk index, cosine similarity), best first
+        """
+        return self.search_many([query], top_k)[0]
+
+
+class SharedResources:
+    """Process-wide model clients and knowledge index referenced by every per-user bot."""
+    
+    def __init__(self, knowledge_base_path: str = "knowledge_base.txt", embedding_model=None):
+        """
+        Create the shared clients and load the knowledge index.
+        
+        Args:
+            knowledge_base_path: Path to the knowledge base text file
+            embedding_model: Optional embedding model (defaults to OpenAI, or the local
+                stub when EMBEDDING_BACKEND=local)
+        """
+        print("🚀 Initializing shared Career Bot resources...")
+        print("="*70)
         
         # Initialize LangSmith tracing
         self._setup_langsmith_tracing()
         
-        # Use profile data if provided, otherwise fetch from database
-        if user_profile:
-            print(f"👤 Using provided user profile for User ID: {user_id}")
-            if user_profile.get('skills'):
-                self.user_skills = user_profile['skills']
-                print(f"✓ Loaded {len(self.user_skills)} skills from profile")
-                for skill in self.user_skills[:5]:  # Show first 5
-                    print(f"   • {skill.get('name')} ({skill.get('proficiency')})")
-                if len(self.user_skills) > 5:
-                    print(f"   ... and {len(self.user_skills) - 5} more")
-        elif user_id:
-            print(f"👤 Fetching skills for User ID: {user_id}")
-            self.user_skills = self._fetch_user_skills(user_id)
-            if self.user_skills:
-                print(f"✓ Found {len(self.user_skills)} skills for this user")
-                for skill in self.user_skills:
-                    print(f"   • {skill['skillName']} ({skill['proficiency']})")
-            else:
-                print("⚠ No skills found for this user")
-        
         # Initialize OpenAI embedding model
         print("\n🔢 Initializing OpenAI Embedding Model...")
         api_key = os.getenv("OPENAI_API_KEY")
         if not api_key:
             raise ValueError("OPENAI_API_KEY not found in environment variables")
         
-        self.embedding_model = OpenAIEmbeddings(
-            model="text-embedding-3-small",
-            openai_api_key=api_key
-        )
-        print("✓ OpenAI Embeddings initialized (text-embedding-3-small)")
-        
-        # Load and process knowledge base
-        print("\n📖 Loading Career & Employment Knowledge Base...")
-        self.knowledge_chunks = self._load_and_chunk_knowledge_base(knowledge_base_path)
-        print(f"✓ Loaded {len(self.knowledge_chunks)} career guidance chunks")
+        if embedding_model is not None:
+            self.embedding_model = embedding_model
+        elif os.getenv("EMBEDDING_BACKEND", "openai").lower() == "local":
+            self.embedding_model = LocalHashEmbeddings()
+        else:
+            self.embedding_model = OpenAIEmbeddings(
+                model="text-embedding-3-small",
+                openai_api_key=api_key
+            )
+        print(f"✓ Embeddings initialized ({self.embedding_model.model})")
         
-        # Create embeddings for all chunks using OpenAI
-        print("\n🔢 Creating embeddings using OpenAI...")
-        self.chunk_embeddings = self._create_embeddings(self.knowledge_chunks)
-        print("✓ Knowledge base embeddings created")
+        self.knowledge_index = KnowledgeIndex(knowledge_base_path, self.embedding_model)
         
         # Configure OpenAI LLM with streaming
         print("\n🤖 Configuring OpenAI LLM with Streaming...")
@@ -107,27 +251,23 @@ class CareerBotRAG:
             model="gpt-4o-mini",
             api_key=api_key,
             temperature=0.7,
-            streaming=True
+            streaming=True,
+            # Report token usage (including cached prompt tokens) on streamed responses
+            stream_usage=True
         )
         print("✓ OpenAI LLM configured (gpt-4o-mini) with streaming enabled")
         
-        # Initialize memory saver
-        print("\n💾 Initializing Conversation Memory...")
-        self.memory = MemorySaver()
-        print("✓ In-memory conversation storage ready")
-        
-        # Build LangGraph workflow with memory
+        # Compile the workflow once; sessions only differ by thread_id and run config
         print("\n🔧 Building LangGraph Workflow with Memory...")
-        self._setup_graph()
+        self.checkpointer = MemorySaver()
+        self.graph = build_chat_graph(self.llm, self.checkpointer)
         print("✓ LangGraph workflow ready with checkpointing")
-        
         print("="*70)
-        print("✅ Career Bot initialization complete!")
-        print("💡 Ready to provide personalized career guidance with streaming!\n")
     
     def _setup_langsmith_tracing(self):
         """
         Initialize LangSmith tracing for monitoring and debugging LangGraph workflows.
+        Runs once per process; every bot shares the resulting client.
         """
         print("\n🔍 Setting up LangSmith Tracing...")
         
@@ -178,6 +318,302 @@ class CareerBotRAG:
         except Exception as e:
             print(f"❌ Failed to initialize LangSmith: {e}")
             self.langsmith_client = None
+
+
+_shared_resources: Dict[Tuple, SharedResources] = {}
+_shared_resources_lock = threading.Lock()
+
+
+def get_shared_resources(knowledge_base_path: str = "knowledge_base.txt", embedding_model=None) -> SharedResources:
+    """
+    Return the process-wide resources for a knowledge base, creating them on first use.
+    
+    Args:
+        knowledge_base_path: Path to the knowledge base text file
+        embedding_model: Optional embedding model; resources are shared per model name
+    """
+    model_key = getattr(embedding_model, "model", None) or os.getenv("EMBEDDING_BACKEND", "openai").lower()
+    key = (os.path.abspath(knowledge_base_path), model_key)
+    with _shared_resources_lock:
+        if key not in _shared_resources:
+            _shared_resources[key] = SharedResources(knowledge_base_path, embedding_model)
+        return _shared_resources[key]
+
+
+def knowledge_index_stats() -> Dict[str, Dict]:
+    """Retrieval metrics for every knowledge index loaded in this process."""
+    with _shared_resources_lock:
+        items = list(_shared_resources.items())
+    return {f"{path} ({model})": shared.knowledge_index.stats() for (path, model), shared in items}
+
+
+# Instructions shared by every session. The text is identical for all users and
+# turns so the provider can cache it as a prompt prefix; profile data is sent in
+# a separate message after it (see CareerBotRAG._profile_messages).
+CAREER_ADVISOR_PROMPT = """You are an AI-powered Career Advisor for a Youth Employment & Career Roadmap Platform.
+
+⚠️ CRITICAL SCOPE RESTRICTION:
+You MUST ONLY respond to questions about CAREERS, JOBS, PROFESSIONAL DEVELOPMENT, and WORK-RELATED topics.
+If a user asks about anything else (making objects, recipes, games, general knowledge, etc.), politely decline and redirect them to career topics.
+
+Example off-topic responses:
+- User: "How to make a pencil?"
+  You: "I'm a career guidance AI assistant focused on helping with your professional development. I can't help with manufacturing or DIY projects. However, I'd be happy to discuss careers in:
+  • Product Design & Engineering
+  • Manufacturing & Production Management
+  • Supply Chain & Operations
+  
+  Would you like to explore career paths in any of these fields?"
+
+- User: "Tell me a recipe"
+  You: "I specialize in career guidance, not cooking! But if you're interested in culinary careers, I can help you explore:
+  • Chef & Culinary Arts careers
+  • Food Science & Technology
+  • Restaurant Management
+  • Food Product Development
+  
+  Are you interested in any food industry careers?"
+
+Your role is to provide HIGHLY PERSONALIZED career guidance across 10 specialized domains:
+1. 🤖 AI & Machine Learning
+2. 🌐 Web Development (Frontend, Backend, Full-Stack)
+3. 📱 Mobile App Development (iOS, Android, Cross-Platform)
+4. 🎨 UI/UX Design
+5. 📊 Data Science & Analytics
+6. 📈 Digital Marketing (SEO, PPC, Content, Social Media)
+7. ☁️ Cloud & DevOps
+8. 🔐 Cybersecurity
+9. 📦 Product Management
+10. 💼 General Career Development
+
+CAPABILITIES (CAREER-FOCUSED ONLY):
+- Career path recommendations based on user's actual experience, projects, and skills
+- Skill development roadmaps tailored to their current proficiency levels
+- Job search strategies aligned with their target roles and career track
+- Salary expectations based on their experience level and location
+- Career transition guidance considering their existing background
+- Industry trends relevant to their preferred domains
+- Portfolio building advice using their actual projects
+- Interview preparation customized to their target positions
+
+PERSONALIZATION INSTRUCTIONS:
+1. ALWAYS refer to the user's actual profile data when giving advice
+2. Acknowledge their existing skills, projects, and experience in your responses
+3. Use their preferred career track and target roles to focus recommendations
+4. Consider their experience level (Fresher/Junior/Mid/Senior) when suggesting timelines
+5. Reference their actual work experience and projects when discussing capabilities
+6. Tailor learning paths based on skills they already have vs. skills they need
+7. Use get_user_skills tool to access their complete profile when needed
+8. Use search_career_knowledge tool for domain-specific information
+
+RESPONSE GUIDELINES:
+- Start by acknowledging relevant aspects of their profile (e.g., "Given your experience in X...")
+- Provide specific, actionable advice based on their actual background
+- Suggest concrete next steps that build on their existing foundation
+- When discussing projects or experience, reference what they've already done
+- Be encouraging about their progress and realistic about growth timelines
+- Cite specific resources, salary ranges, and timelines when available
+- If their profile is incomplete, politely ask for relevant details
+- IMMEDIATELY DECLINE non-career questions and redirect to career topics
+
+TONE: Professional yet warm, empathetic, motivating, and solution-focused.
+Remember: You have access to their complete profile - use it to provide truly personalized guidance!
+STRICT RULE: Only answer career, job, and professional development questions. Politely refuse everything else."""
+
+CAREER_ADVISOR_SYSTEM_MESSAGE = SystemMessage(content=CAREER_ADVISOR_PROMPT)
+
+
+_token_usage = {"turns": 0, "llm_calls": 0, "input_tokens": 0, "cached_input_tokens": 0, "output_tokens": 0}
+_token_usage_lock = threading.Lock()
+
+
+def token_usage_stats() -> Dict:
+    """LLM token counts summed over every session in this process."""
+    with _token_usage_lock:
+        usage = dict(_token_usage)
+    usage["prefix_cache_hit_rate"] = (round(usage["cached_input_tokens"] / usage["input_tokens"], 3)
+                                      if usage["input_tokens"] else 0)
+    return usage
+
+
+def _session_bot(config: RunnableConfig) -> 'CareerBotRAG':
+    """The bot whose turn is running; passed in the run config by ask_stream_events."""
+    return config["configurable"]["bot"]
+
+
+@tool
+@traceable(name="search_career_knowledge_tool") if LANGSMITH_AVAILABLE else lambda x: x
+def search_career_knowledge(query: str, config: RunnableConfig) -> str:
+    """
+    Search the career guidance and employment knowledge base across 10 categories:
+    AI & Machine Learning, Web Development, Digital Marketing, UI/UX Design, 
+    Mobile Development, Data Science, Cloud & DevOps, Cybersecurity, 
+    Product Management, and General Career Development.
+    
+    Use this tool when the user asks about:
+    - Career paths and opportunities in any tech field
+    - Skills to learn for specific roles
+    - Job search strategies
+    - Interview preparation
+    - Salary information
+    - Career transitions
+    - Professional development
+    - Any career-related questions
+    
+    Args:
+        query: The search query
+        
+    Returns:
+        Relevant career guidance information
+    """
+    return _session_bot(config)._retrieve_relevant_context(query, top_k=3)
+
+
+@tool
+@traceable(name="get_user_skills_tool") if LANGSMITH_AVAILABLE else lambda x: x
+def get_user_skills(config: RunnableConfig) -> str:
+    """
+    Get the current user's complete profile including personal info, skills, 
+    work experience, projects, education, and career preferences.
+    
+    Use this tool when:
+    - User asks about their profile, background, or experience
+    - Providing personalized career recommendations
+    - Need to understand user's current skills and proficiency levels
+    - Suggesting learning paths tailored to their background
+    - Discussing their projects or work experience
+    - Referencing their career goals and target roles
+    - Need context about their education and qualifications
+    
+    Returns:
+        Comprehensive user profile with all available data including:
+        - Personal information (name, contact details)
+        - Professional summary
+        - Experience level and preferred career track
+        - Detailed work experience history
+        - Projects with descriptions and technologies
+        - Education background
+        - Skills with proficiency levels
+        - Target roles and career goals
+    """
+    return _session_bot(config)._get_user_context()
+
+
+CHAT_TOOLS = [search_career_knowledge, get_user_skills]
+
+
+class ChatState(TypedDict):
+    messages: Annotated[list[BaseMessage], add_messages]
+
+
+def build_chat_graph(llm, checkpointer):
+    """
+    Compile the chat workflow shared by every session.
+    
+    Nothing user-specific is captured at compile time: each run passes its bot
+    in config["configurable"]["bot"], so profile updates take effect on the
+    next model call without rebuilding anything.
+    
+    Args:
+        llm: Chat model to bind the tools to
+        checkpointer: Conversation memory; sessions are separated by thread_id
+    """
+    llm_with_tools = llm.bind_tools(CHAT_TOOLS)
+    
+    def chat_node(state: ChatState, config: RunnableConfig):
+        bot = _session_bot(config)
+        # Static instructions first so every call shares a cacheable prefix,
+        # then this user's profile, then the conversation
+        messages = [CAREER_ADVISOR_SYSTEM_MESSAGE, *bot._profile_messages(), *state["messages"]]
+        
+        response = llm_with_tools.invoke(messages)
+        bot._record_usage(response)
+        return {"messages": [response]}
+    
+    graph = StateGraph(ChatState)
+    graph.add_node("chat_node", chat_node)
+    graph.add_node("tools", ToolNode(CHAT_TOOLS))
+    
+    graph.add_edge(START, "chat_node")
+    graph.add_conditional_edges("chat_node", tools_condition)
+    graph.add_edge("tools", "chat_node")
+    
+    # Compile with memory checkpointing
+    return graph.compile(checkpointer=checkpointer)
+
+
+class CareerBotRAG:
+    """AI-Powered Youth Employment & Career Roadmap Platform with Streaming, Memory, and Personalization."""
+    
+    def __init__(self, knowledge_base_path: str = "knowledge_base.txt", user_id: Optional[int] = None, user_profile: Optional[Dict] = None,
+                 embedding_model=None):
+        """
+        Initialize the Career Bot with RAG capabilities, streaming, and memory.
+        
+        Args:
+            knowledge_base_path: Path to the knowledge base text file
+            user_id: Optional user ID to fetch personalized skills from database
+            user_profile: Optional comprehensive user profile data from backend
+            embedding_model: Optional embedding model (defaults to OpenAI, or the local
+                stub when EMBEDDING_BACKEND=local)
+        """
+        print("🚀 Initializing AI-Powered Career Bot session...")
+        
+        # Store user ID and profile for personalization
+        self.user_id = user_id
+        self.user_profile = user_profile or {}
+        self.user_skills = []
+        
+        # Initialize thread ID for conversation memory
+        self.thread_id = str(uuid.uuid4())
+        print(f"🔗 Thread ID: {self.thread_id}")
+        
+        # Characters of conversation history held in this session's checkpoints
+        self.history_chars = 0
+        
+        # Streams in progress; close() waits for them before deleting the thread
+        self._active_streams = 0
+        self._close_requested = False
+        self._stream_lock = threading.Lock()
+        
+        # Profile message sent after the static prompt; rebuilt only when the profile changes
+        self._profile_message = None
+        
+        # Token usage of the current turn (summed over tool round-trips)
+        self.last_turn_usage = {}
+        
+        # Use profile data if provided, otherwise fetch from database
+        if user_profile:
+            print(f"👤 Using provided user profile for User ID: {user_id}")
+            if user_profile.get('skills'):
+                self.user_skills = user_profile['skills']
+                print(f"✓ Loaded {len(self.user_skills)} skills from profile")
+                for skill in self.user_skills[:5]:  # Show first 5
+                    print(f"   • {skill.get('name')} ({skill.get('proficiency')})")
+                if len(self.user_skills) > 5:
+                    print(f"   ... and {len(self.user_skills) - 5} more")
+        elif user_id:
+            print(f"👤 Fetching skills for User ID: {user_id}")
+            self.user_skills = self._fetch_user_skills(user_id)
+            if self.user_skills:
+                print(f"✓ Found {len(self.user_skills)} skills for this user")
+                for skill in self.user_skills:
+                    print(f"   • {skill['skillName']} ({skill['proficiency']})")
+            else:
+                print("⚠ No skills found for this user")
+        
+        # Reference the process-wide index and model clients instead of per-user copies
+        shared = get_shared_resources(knowledge_base_path, embedding_model)
+        self.langsmith_client = shared.langsmith_client
+        self.embedding_model = shared.embedding_model
+        self.knowledge_index = shared.knowledge_index
+        self.llm = shared.llm
+        
+        # The compiled workflow and its checkpointer are shared; this session is its thread_id
+        self.checkpointer = shared.checkpointer
+        self.graph = shared.graph
+        
+        print("✅ Career Bot session ready!\n")
     
     def _fetch_user_skills(self, user_id: int) -> List[Dict]:
         """
@@ -190,19 +626,10 @@ class CareerBotRAG:
             List of skill dictionaries with skillName and proficiency
         """
         skills = []
-        connection = None
         
         try:
-            # Create database connection
-            connection = mysql.connector.connect(
-                host="localhost",
-                user="root",
-                password="",
-                database="youth_employment_db",
-                port=3307
-            )
-            
-            if connection.is_connected():
+            # Check out a pooled database connection
+            with get_connection(database="youth_employment_db") as connection:
                 cursor = connection.cursor(dictionary=True)
                 
                 # Query to fetch user skills
@@ -216,57 +643,12 @@ class CareerBotRAG:
                 cursor.execute(query, (user_id,))
                 skills = cursor.fetchall()
                 cursor.close()
-                
+        
         except Error as e:
             print(f"❌ Database error while fetching skills: {e}")
         
-        finally:
-            if connection and connection.is_connected():
-                connection.close()
-        
         return skills
     
-    def _load_and_chunk_knowledge_base(self, file_path: str) -> List[str]:
-        """
-        Load and chunk the knowledge base file.
-        
-        Args:
-            file_path: Path to the knowledge base file
-            
-        Returns:
-            List of text chunks (Q&A pairs)
-        """
-        if not os.path.exists(file_path):
-            raise FileNotFoundError(f"Knowledge base file not found: {file_path}")
-        
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        # Split by Q: to get individual Q&A pairs
-        chunks = []
-        parts = content.split('Q: ')
-        
-        for part in parts:
-            if part.strip():
-                chunk = 'Q: ' + part.strip()
-                chunks.append(chunk)
-        
-        return chunks
-    
-    def _create_embeddings(self, texts: List[str]) -> np.ndarray:
-        """
-        Create embeddings using OpenAI's embedding model.
-        
-        Args:
-            texts: List of text strings to embed
-            
-        Returns:
-            Numpy array of embeddings
-        """
-        # Use OpenAI embeddings
-        embeddings = self.embedding_model.embed_documents(texts)
-        return np.array(embeddings)
-    
     def _get_user_context(self) -> str:
         """
         Generate comprehensive user context string from their profile.
@@ -389,177 +771,66 @@ class CareerBotRAG:
             user_profile: New user profile data
         """
         if user_profile:
+            if user_profile == self.user_profile:
+                return
             self.user_profile = user_profile
             if user_profile.get('skills'):
                 self.user_skills = user_profile['skills']
+            self._profile_message = None
             print(f"✓ User profile updated for User ID: {self.user_id}")
     
-    def _setup_graph(self):
-        """Set up the LangGraph workflow with tools and memory."""
-        
-        # Create a tool for career knowledge search
-        @tool
-        @traceable(name="search_career_knowledge_tool") if LANGSMITH_AVAILABLE else lambda x: x
-        def search_career_knowledge(query: str) -> str:
-            """
-            Search the career guidance and employment knowledge base across 10 categories:
-            AI & Machine Learning, Web Development, Digital Marketing, UI/UX Design, 
-            Mobile Development, Data Science, Cloud & DevOps, Cybersecurity, 
-            Product Management, and General Career Development.
-            
-            Use this tool when the user asks about:
-            - Career paths and opportunities in any tech field
-            - Skills to learn for specific roles
-            - Job search strategies
-            - Interview preparation
-            - Salary information
-            - Career transitions
-            - Professional development
-            - Any career-related questions
-            
-            Args:
-                query: The search query
-                
-            Returns:
-                Relevant career guidance information
-            """
-            return self._retrieve_relevant_context(query, top_k=3)
-        
-        # Create a tool to get user profile
-        @tool
-        @traceable(name="get_user_skills_tool") if LANGSMITH_AVAILABLE else lambda x: x
-        def get_user_skills() -> str:
-            """
-            Get the current user's complete profile including personal info, skills, 
-            work experience, projects, education, and career preferences.
-            
-            Use this tool when:
-            - User asks about their profile, background, or experience
-            - Providing personalized career recommendations
-            - Need to understand user's current skills and proficiency levels
-            - Suggesting learning paths tailored to their background
-            - Discussing their projects or work experience
-            - Referencing their career goals and target roles
-            - Need context about their education and qualifications
-            
-            Returns:
-                Comprehensive user profile with all available data including:
-                - Personal information (name, contact details)
-                - Professional summary
-                - Experience level and preferred career track
-                - Detailed work experience history
-                - Projects with descriptions and technologies
-                - Education background
-                - Skills with proficiency levels
-                - Target roles and career goals
-            """
-            return self._get_user_context()
-        
-        # Bind tools to LLM
-        self.tools = [search_career_knowledge, get_user_skills]
-        self.llm_with_tools = self.llm.bind_tools(self.tools)
-        
-        # Define state
-        class ChatState(TypedDict):
-            messages: Annotated[list[BaseMessage], add_messages]
-        
-        # Enhanced system prompt for career guidance
-        user_info = f"\n\n=== CURRENT USER PROFILE ===\n{self._get_user_context()}\n========================\n" if (self.user_profile or self.user_skills) else ""
-        
-        system_prompt = f"""You are an AI-powered Career Advisor for a Youth Employment & Career Roadmap Platform.
-
-⚠️ CRITICAL SCOPE RESTRICTION:
-You MUST ONLY respond to questions about CAREERS, JOBS, PROFESSIONAL DEVELOPMENT, and WORK-RELATED topics.
-If a user asks about anything else (making objects, recipes, games, general knowledge, etc.), politely decline and redirect them to career topics.
-
-Example off-topic responses:
-- User: "How to make a pencil?"
-  You: "I'm a career guidance AI assistant focused on helping with your professional development. I can't help with manufacturing or DIY projects. However, I'd be happy to discuss careers in:
-  • Product Design & Engineering
-  • Manufacturing & Production Management
-  • Supply Chain & Operations
-  
-  Would you like to explore career paths in any of these fields?"
-
-- User: "Tell me a recipe"
-  You: "I specialize in career guidance, not cooking! But if you're interested in culinary careers, I can help you explore:
-  • Chef & Culinary Arts careers
-  • Food Science & Technology
-  • Restaurant Management
-  • Food Product Development
-  
-  Are you interested in any food industry careers?"
-
-Your role is to provide HIGHLY PERSONALIZED career guidance across 10 specialized domains:
-1. 🤖 AI & Machine Learning
-2. 🌐 Web Development (Frontend, Backend, Full-Stack)
-3. 📱 Mobile App Development (iOS, Android, Cross-Platform)
-4. 🎨 UI/UX Design
-5. 📊 Data Science & Analytics
-6. 📈 Digital Marketing (SEO, PPC, Content, Social Media)
-7. ☁️ Cloud & DevOps
-8. 🔐 Cybersecurity
-9. 📦 Product Management
-10. 💼 General Career Development
-
-CAPABILITIES (CAREER-FOCUSED ONLY):
-- Career path recommendations based on user's actual experience, projects, and skills
-- Skill development roadmaps tailored to their current proficiency levels
-- Job search strategies aligned with their target roles and career track
-- Salary expectations based on their experience level and location
-- Career transition guidance considering their existing background
-- Industry trends relevant to their preferred domains
-- Portfolio building advice using their actual projects
-- Interview preparation customized to their target positions
-
-PERSONALIZATION INSTRUCTIONS:
-1. ALWAYS refer to the user's actual profile data when giving advice
-2. Acknowledge their existing skills, projects, and experience in your responses
-3. Use their preferred career track and target roles to focus recommendations
-4. Consider their experience level (Fresher/Junior/Mid/Senior) when suggesting timelines
-5. Reference their actual work experience and projects when discussing capabilities
-6. Tailor learning paths based on skills they already have vs. skills they need
-7. Use get_user_skills tool to access their complete profile when needed
-8. Use search_career_knowledge tool for domain-specific information
-
-RESPONSE GUIDELINES:
-- Start by acknowledging relevant aspects of their profile (e.g., "Given your experience in X...")
-- Provide specific, actionable advice based on their actual background
-- Suggest concrete next steps that build on their existing foundation
-- When discussing projects or experience, reference what they've already done
-- Be encouraging about their progress and realistic about growth timelines
-- Cite specific resources, salary ranges, and timelines when available
-- If their profile is incomplete, politely ask for relevant details
-- IMMEDIATELY DECLINE non-career questions and redirect to career topics{user_info}
-
-TONE: Professional yet warm, empathetic, motivating, and solution-focused.
-Remember: You have access to their complete profile - use it to provide truly personalized guidance!
-STRICT RULE: Only answer career, job, and professional development questions. Politely refuse everything else."""
-        
-        # Create nodes
-        def chat_node(state: ChatState):
-            messages = state["messages"]
-            
-            # Add system message if not present
-            if not messages or not isinstance(messages[0], SystemMessage):
-                messages = [SystemMessage(content=system_prompt)] + messages
-            
-            response = self.llm_with_tools.invoke(messages)
-            return {"messages": [response]}
-        
-        tool_node = ToolNode(self.tools)
-        
-        # Build graph with memory
-        graph = StateGraph(ChatState)
-        graph.add_node("chat_node", chat_node)
-        graph.add_node("tools", tool_node)
+    def close(self):
+        """
+        Drop this session's conversation history from the shared checkpointer.
         
-        graph.add_edge(START, "chat_node")
-        graph.add_conditional_edges("chat_node", tools_condition)
-        graph.add_edge("tools", "chat_node")
+        If a stream is still running, the thread is deleted when the last one
+        ends; deleting it earlier would leave that run's checkpoints behind.
+        """
+        with self._stream_lock:
+            self._close_requested = True
+            if self._active_streams:
+                return
+        self._delete_thread()
+    
+    def _delete_thread(self):
+        """Delete this session's checkpoints now."""
+        self.checkpointer.delete_thread(self.thread_id)
+        self.history_chars = 0
+    
+    def _profile_messages(self) -> List[SystemMessage]:
+        """The per-user profile message (if any profile data exists), built once per profile version."""
+        if self._profile_message is None and (self.user_profile or self.user_skills):
+            self._profile_message = SystemMessage(
+                content=f"=== CURRENT USER PROFILE ===\n{self._get_user_context()}\n========================"
+            )
+        return [self._profile_message] if self._profile_message is not None else []
+    
+    def _record_usage(self, response: BaseMessage):
+        """Add a model call's token usage to this turn's and the process-wide counters."""
+        usage = getattr(response, "usage_metadata", None) or {}
+        cached = (usage.get("input_token_details") or {}).get("cache_read", 0) or 0
+        counts = {
+            "llm_calls": 1,
+            "input_tokens": usage.get("input_tokens", 0),
+            "cached_input_tokens": cached,
+            "output_tokens": usage.get("output_tokens", 0)
+        }
+        for name, value in counts.items():
+            self.last_turn_usage[name] = self.last_turn_usage.get(name, 0) + value
+        with _token_usage_lock:
+            for name, value in counts.items():
+                _token_usage[name] += value
+    
+    def estimate_memory_bytes(self) -> int:
+        """
+        Rough memory footprint of this session's per-user state.
         
-        # Compile with memory checkpointing
-        self.graph = graph.compile(checkpointer=self.memory)
+        Counts the profile and conversation history; the knowledge index and
+        model clients are shared across sessions and not included.
+        """
+        profile_bytes = len(json.dumps(self.user_profile, default=str))
+        # LangGraph keeps a checkpoint per step, each holding the message list
+        return 4096 + profile_bytes + self.history_chars * 4
     
     @traceable(name="rag_retrieval") if LANGSMITH_AVAILABLE else lambda x: x
     def _retrieve_relevant_context(self, query: str, top_k: int = 3) -> str:
@@ -573,32 +844,41 @@ STRICT RULE: Only answer career, job, and professional development questions. Po
         Returns:
             Concatenated relevant context
         """
-        # Create embedding for the query using OpenAI
-        query_embedding = np.array(self.embedding_model.embed_query(query))
-        
-        # Calculate cosine similarity
-        similarities = np.dot(self.chunk_embeddings, query_embedding) / (
-            np.linalg.norm(self.chunk_embeddings, axis=1) * np.linalg.norm(query_embedding)
-        )
-        
-        # Get indices of top_k most similar chunks
-        top_indices = np.argsort(similarities)[-top_k:][::-1]
-        top_scores = similarities[top_indices]
+        # Search the shared knowledge index
+        results = self.knowledge_index.search(query, top_k=top_k)
+        chunks = self.knowledge_index.chunks
         
         # Print retrieval information
         print(f"\n🔍 RAG Retrieval Results:")
-        for idx, (chunk_idx, score) in enumerate(zip(top_indices, top_scores), 1):
+        for idx, (chunk_idx, score) in enumerate(results, 1):
             print(f"  [{idx}] Similarity: {score:.4f}")
-            preview = self.knowledge_chunks[chunk_idx][:100].replace('\n', ' ')
+            preview = chunks[chunk_idx][:100].replace('\n', ' ')
             print(f"      Preview: {preview}...")
         
-        # Retrieve the actual chunks
-        relevant_chunks = [self.knowledge_chunks[idx] for idx in top_indices]
+        return self._format_context(results)
+    
+    @traceable(name="rag_retrieval_batch") if LANGSMITH_AVAILABLE else lambda x: x
+    def retrieve_many(self, queries: List[str], top_k: int = 3) -> List[str]:
+        """
+        Retrieve knowledge base context for several queries at once.
         
-        # Concatenate with clear separation
-        context = "\n\n---\n\n".join(relevant_chunks)
+        Embeds all queries in one request and scores them with a single
+        matrix product against the shared index.
         
-        return context
+        Args:
+            queries: User questions
+            top_k: Number of top chunks per query
+        
+        Returns:
+            Concatenated relevant context per query, in input order
+        """
+        return [self._format_context(results)
+                for results in self.knowledge_index.search_many(queries, top_k=top_k)]
+    
+    def _format_context(self, results: List[Tuple[int, float]]) -> str:
+        """Concatenate retrieved chunks with clear separation."""
+        chunks = self.knowledge_index.chunks
+        return "\n\n---\n\n".join(chunks[idx] for idx, _ in results)
     
     def _log_query_to_langsmith(self, query: str):
         """
@@ -644,7 +924,7 @@ STRICT RULE: Only answer career, job, and professional development questions. Po
                     "thread_id": self.thread_id,
                     "query_length": len(query),
                     "query_tokens": len(query.split()),
-                    "knowledge_base_chunks": len(self.knowledge_chunks),
+                    "knowledge_base_chunks": len(self.knowledge_index.chunks),
                     "has_user_context": bool(self.user_profile or self.user_skills),
                     "user_skills_count": len(self.user_skills)
                 }
@@ -668,15 +948,22 @@ STRICT RULE: Only answer career, job, and professional development questions. Po
             return {}
     
     @traceable(name="career_bot_query") if LANGSMITH_AVAILABLE else lambda x: x
-    def ask_stream(self, query: str):
+    def ask_stream_events(self, query: str):
         """
-        Answer a user question using RAG with streaming response (like ChatGPT).
+        Answer a user question, streaming LLM tokens as they are generated.
+        
+        Uses LangGraph "messages" streaming, so the first token reaches the
+        caller as soon as the model produces it instead of after each graph step.
         
         Args:
             query: User's question
             
         Yields:
-            Streamed response chunks
+            Event dicts:
+                {"type": "token", "content": str}      - answer text delta
+                {"type": "tool_start", "tool": str}    - model decided to call a tool
+                {"type": "tool_end", "tool": str}      - tool finished
+                {"type": "error", "content": str}      - generation failed
         """
         print(f"\n💬 User Question: {query}")
         print("-"*70)
@@ -685,28 +972,45 @@ STRICT RULE: Only answer career, job, and professional development questions. Po
         # Add LangSmith tracing metadata
         self._log_query_to_langsmith(query)
         
+        with self._stream_lock:
+            self._active_streams += 1
         try:
             # Configuration for thread-based memory
-            config = {"configurable": {"thread_id": self.thread_id}}
+            config = {"configurable": {"thread_id": self.thread_id, "bot": self}}
             
-            # Stream the response
+            # Stream token deltas from the chat node and tool results from the tool node
             full_response = ""
-            for chunk in self.graph.stream(
+            self.last_turn_usage = {}
+            for message, metadata in self.graph.stream(
                 {"messages": [HumanMessage(content=query)]},
                 config=config,
-                stream_mode="values"
+                stream_mode="messages"
             ):
-                messages = chunk.get("messages", [])
-                if messages:
-                    last_message = messages[-1]
-                    if isinstance(last_message, AIMessage) and last_message.content:
-                        # Extract new content
-                        if len(last_message.content) > len(full_response):
-                            new_content = last_message.content[len(full_response):]
-                            print(new_content, end="", flush=True)
-                            full_response = last_message.content
-                            yield new_content
+                if isinstance(message, ToolMessage):
+                    yield {"type": "tool_end", "tool": message.name}
+                    continue
+                
+                if not isinstance(message, AIMessageChunk) or metadata.get("langgraph_node") != "chat_node":
+                    continue
+                
+                # The first chunk of each tool call carries its name
+                for tool_chunk in message.tool_call_chunks or []:
+                    if tool_chunk.get("name"):
+                        print(f"\n🛠️ Calling tool: {tool_chunk['name']}", flush=True)
+                        yield {"type": "tool_start", "tool": tool_chunk["name"]}
+                
+                if message.content and isinstance(message.content, str):
+                    print(message.content, end="", flush=True)
+                    full_response += message.content
+                    yield {"type": "token", "content": message.content}
             
+            self.history_chars += len(query) + len(full_response)
+            with _token_usage_lock:
+                _token_usage["turns"] += 1
+            usage = self.last_turn_usage
+            if usage.get("input_tokens"):
+                print(f"\n📏 Tokens: {usage['input_tokens']} in ({usage['cached_input_tokens']} cached), "
+                      f"{usage['output_tokens']} out over {usage['llm_calls']} model call(s)", end="")
             print("\n" + "-"*70 + "\n")
             
         except Exception as e:
@@ -714,7 +1018,27 @@ STRICT RULE: Only answer career, job, and professional development questions. Po
             print(f"\n❌ {error_msg}\n")
             import traceback
             traceback.print_exc()
-            yield error_msg
+            yield {"type": "error", "content": error_msg}
+        finally:
+            with self._stream_lock:
+                self._active_streams -= 1
+                deferred_close = self._close_requested and not self._active_streams
+            if deferred_close:
+                self._delete_thread()
+    
+    def ask_stream(self, query: str):
+        """
+        Answer a user question using RAG with streaming response (like ChatGPT).
+        
+        Args:
+            query: User's question
+            
+        Yields:
+            Streamed response chunks (token deltas)
+        """
+        for event in self.ask_stream_events(query):
+            if event["type"] in ("token", "error"):
+                yield event["content"]
     
     def ask(self, query: str) -> str:
         """
@@ -0,0 +1,221 @@
+"""
+Bounded thread pools for blocking work called from async API handlers
+
+LangGraph's sync stream, OpenAI calls and MySQL queries block. Running them
+on the event loop stalls every other request on the worker, so handlers hand
+them to a bounded pool and await the results instead.
+
+Settings (environment variables):
+    CHAT_STREAM_WORKERS  - threads pumping chat streams (default 32)
+    CHAT_STREAM_BUFFER   - chunks buffered per stream before the producer waits (default 64)
+    CHAT_STREAM_QUEUE    - streams waiting for a worker before new chats are rejected (default 256)
+    JOB_MATCH_WORKERS    - threads computing job matches (default 4)
+    JOB_MATCH_QUEUE      - matches waiting for a worker before requests are rejected (default 64)
+    JOB_MATCH_BATCH_WORKERS - threads streaming /match-jobs/batch results (default 2)
+    JOB_MATCH_BATCH_QUEUE   - batches waiting for a worker before requests are rejected (default 4)
+"""
+
+import os
+import asyncio
+import threading
+import weakref
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import AsyncIterator, Callable, Dict, Hashable, Iterable, Optional, TypeVar
+
+T = TypeVar("T")
+
+STREAM_WORKERS = int(os.getenv("CHAT_STREAM_WORKERS", "32"))
+STREAM_BUFFER = int(os.getenv("CHAT_STREAM_BUFFER", "64"))
+STREAM_QUEUE = int(os.getenv("CHAT_STREAM_QUEUE", "256"))
+JOB_MATCH_WORKERS = int(os.getenv("JOB_MATCH_WORKERS", "4"))
+JOB_MATCH_QUEUE = int(os.getenv("JOB_MATCH_QUEUE", "64"))
+JOB_MATCH_BATCH_WORKERS = int(os.getenv("JOB_MATCH_BATCH_WORKERS", "2"))
+JOB_MATCH_BATCH_QUEUE = int(os.getenv("JOB_MATCH_BATCH_QUEUE", "4"))
+
+_DONE = object()
+
+
+class _Failure:
+    __slots__ = ("error",)
+
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+def iterate_in_thread(iterable: Iterable[T], executor: Optional['BoundedExecutor'] = None,
+                      max_buffer: int = STREAM_BUFFER) -> AsyncIterator[T]:
+    """
+    Consume a blocking iterable on a worker thread and return its items asynchronously
+
+    The producer thread stops after max_buffer unconsumed items (backpressure)
+    and stops for good when the consumer goes away, e.g. a client disconnect.
+    Exceptions raised by the iterable are re-raised in the consumer.
+
+    Raises:
+        ExecutorBusy: If the pool (stream_executor by default) is full
+    """
+    return (executor or stream_executor).stream(iterable, max_buffer)
+
+
+def _consume_in_thread(iterable: Iterable[T], submit: Callable[[Callable[[], None]], Future],
+                       max_buffer: int) -> AsyncIterator[T]:
+    """Start a producer thread via submit() and return the async consumer side"""
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+    slots = threading.Semaphore(max_buffer)
+    stopped = threading.Event()
+
+    def deliver(item) -> bool:
+        try:
+            loop.call_soon_threadsafe(queue.put_nowait, item)
+            return True
+        except RuntimeError:
+            # Event loop closed underneath us
+            return False
+
+    def pump():
+        iterator = iter(iterable)
+        try:
+            for item in iterator:
+                while not slots.acquire(timeout=0.1):
+                    if stopped.is_set():
+                        return
+                if stopped.is_set() or not deliver(item):
+                    return
+        except BaseException as e:
+            deliver(_Failure(e))
+        finally:
+            close = getattr(iterator, "close", None)
+            if close:
+                close()
+            deliver(_DONE)
+
+    submit(pump)
+    consumer = _drain(queue, slots, stopped)
+    # A consumer dropped before its first item never runs its finally block
+    weakref.finalize(consumer, stopped.set)
+    return consumer
+
+
+async def _drain(queue: asyncio.Queue, slots: threading.Semaphore, stopped: threading.Event):
+    try:
+        while True:
+            item = await queue.get()
+            if item is _DONE:
+                return
+            if isinstance(item, _Failure):
+                raise item.error
+            slots.release()
+            yield item
+    finally:
+        stopped.set()
+
+
+class ExecutorBusy(Exception):
+    """Raised when a BoundedExecutor's queue is full"""
+
+
+class BoundedExecutor:
+    """
+    Dedicated thread pool with a queue-depth limit and single-flight submission
+
+    Identical in-flight calls (same key) share one computation, so a burst of
+    the same request runs once. New keys beyond max_workers running plus
+    max_queue waiting are rejected with ExecutorBusy instead of piling up.
+    A key of None opts out of sharing.
+    """
+
+    def __init__(self, name: str, max_workers: int, max_queue: int):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._admitted = threading.BoundedSemaphore(max_workers + max_queue)
+        self._in_flight: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+
+        self.submitted = 0
+        self.active = 0
+        self.completed = 0
+        self.coalesced = 0
+        self.rejected = 0
+
+    def submit(self, key: Hashable, fn: Callable[..., T], *args, **kwargs) -> Future:
+        """
+        Run fn(*args, **kwargs), or join the identical call already in flight
+
+        Raises:
+            ExecutorBusy: If the pool and its queue are full
+        """
+        with self._lock:
+            future = self._in_flight.get(key) if key is not None else None
+            if future is not None:
+                self.coalesced += 1
+                return future
+
+            if not self._admitted.acquire(blocking=False):
+                self.rejected += 1
+                raise ExecutorBusy(f"{self.name} is at capacity ({self.max_workers} running, "
+                                   f"{self.max_queue} queued)")
+
+            future = self.executor.submit(self._run, fn, args, kwargs)
+            if key is not None:
+                self._in_flight[key] = future
+            self.submitted += 1
+
+        # Registered outside the lock: it runs inline if the future already finished
+        future.add_done_callback(lambda done: self._finish(key, done))
+        return future
+
+    def _run(self, fn: Callable[..., T], args: tuple, kwargs: dict) -> T:
+        with self._lock:
+            self.active += 1
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            with self._lock:
+                self.active -= 1
+                self.completed += 1
+
+    def _finish(self, key: Hashable, future: Future):
+        with self._lock:
+            if key is not None and self._in_flight.get(key) is future:
+                del self._in_flight[key]
+        self._admitted.release()
+
+    async def run(self, key: Hashable, fn: Callable[..., T], *args, **kwargs) -> T:
+        """Async form of submit(); a cancelled caller does not cancel the shared call"""
+        return await asyncio.shield(asyncio.wrap_future(self.submit(key, fn, *args, **kwargs)))
+
+    def stream(self, iterable: Iterable[T], max_buffer: int = STREAM_BUFFER) -> AsyncIterator[T]:
+        """
+        iterate_in_thread() on this pool, admitted like submit()
+
+        The producer holds its slot until the stream ends or is abandoned.
+
+        Raises:
+            ExecutorBusy: If the pool and its queue are full
+        """
+        return _consume_in_thread(iterable, lambda pump: self.submit(None, pump), max_buffer)
+
+    def stats(self) -> dict:
+        """Pool limits and counters; queued is admitted work not yet running"""
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "active": self.active,
+                "queued": self.submitted - self.completed - self.active,
+                "completed": self.completed,
+                "in_flight": len(self._in_flight),
+                "submitted": self.submitted,
+                "coalesced": self.coalesced,
+                "rejected": self.rejected
+            }
+
+
+stream_executor = BoundedExecutor("chat-stream", STREAM_WORKERS, STREAM_QUEUE)
+match_executor = BoundedExecutor("job-match", JOB_MATCH_WORKERS, JOB_MATCH_QUEUE)
+# Separate pool so slow NDJSON readers cannot pin the /match-jobs workers
+batch_match_executor = BoundedExecutor("job-match-batch", JOB_MATCH_BATCH_WORKERS, JOB_MATCH_BATCH_QUEUE)
+
@@ -1,19 +1,258 @@
+"""
+Shared MySQL connection pooling for the career bot services
+
+Every module checks connections out of a process-wide pool instead of opening
+a new connection per call. Pools are keyed by connection settings, so modules
+that talk to different databases each get their own pool.
+
+Settings (environment variables):
+    DB_HOST, DB_USER, DB_PASSWORD, DB_NAME, DB_PORT  - connection defaults
+    DB_POOL_SIZE                  - max connections per pool (default 10)
+    DB_POOL_TIMEOUT               - seconds to wait for a free connection (default 5)
+    DB_POOL_HEALTH_CHECK_SECONDS  - ping connections idle longer than this (default 30)
+"""
+
+import os
+import time
+import threading
+from typing import Dict, List, Optional, Tuple
+
 import mysql.connector
 from mysql.connector import Error
+from mysql.connector.errors import PoolError
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DB_CONFIG = {
+    "host": os.getenv("DB_HOST", "localhost"),
+    "user": os.getenv("DB_USER", "root"),
+    "password": os.getenv("DB_PASSWORD", ""),
+    "database": os.getenv("DB_NAME", "final_db"),
+    "port": int(os.getenv("DB_PORT", "3307"))
+}
+
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+POOL_CHECKOUT_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "5"))
+POOL_HEALTH_CHECK_INTERVAL = float(os.getenv("DB_POOL_HEALTH_CHECK_SECONDS", "30"))
+
+
+class PooledConnection:
+    """Connection checked out of a ConnectionPool; close() returns it to the pool"""
+
+    def __init__(self, pool: 'ConnectionPool', connection):
+        self._pool = pool
+        self._connection = connection
+        self._released = False
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
+    def close(self, reusable: bool = True):
+        """Return the connection to its pool (or discard it if not reusable)"""
+        if not self._released:
+            self._released = True
+            self._pool.release(self._connection, reusable)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # A connection that raised a driver error may be broken - don't reuse it
+        self.close(reusable=not isinstance(exc, Error))
+        return False
+
+
+class ConnectionPool:
+    """Bounded pool of MySQL connections with checkout timeout, health checks and metrics"""
+
+    def __init__(self, name: str, config: Dict, pool_size: int = POOL_SIZE,
+                 checkout_timeout: float = POOL_CHECKOUT_TIMEOUT,
+                 health_check_interval: float = POOL_HEALTH_CHECK_INTERVAL):
+        """
+        Initialize an empty pool; connections are opened lazily
+
+        Args:
+            name: Pool name used in metrics
+            config: mysql.connector connection settings
+            pool_size: Maximum number of open connections
+            checkout_timeout: Seconds to wait for a free connection before raising PoolError
+            health_check_interval: Idle seconds after which a connection is pinged before reuse
+        """
+        self.name = name
+        self.config = config
+        self.pool_size = pool_size
+        self.checkout_timeout = checkout_timeout
+        self.health_check_interval = health_check_interval
+
+        self._slots = threading.BoundedSemaphore(pool_size)
+        self._idle: List[Tuple[object, float]] = []
+        self._lock = threading.Lock()
+
+        self._in_use = 0
+        self._peak_in_use = 0
+        self._checkouts = 0
+        self._waits = 0
+        self._timeouts = 0
+        self._wait_time = 0.0
+        self._created = 0
+        self._discarded = 0
+        self._health_checks = 0
+
+    def get_connection(self, timeout: Optional[float] = None) -> PooledConnection:
+        """
+        Check out a connection, waiting up to the checkout timeout for a free slot
+
+        Raises:
+            PoolError: If no connection became available in time
+        """
+        timeout = self.checkout_timeout if timeout is None else timeout
+        start = time.monotonic()
+
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._waits += 1
+            if not self._slots.acquire(timeout=timeout):
+                with self._lock:
+                    self._timeouts += 1
+                raise PoolError(
+                    f"Timed out after {timeout}s waiting for a connection from pool '{self.name}'"
+                )
+
+        try:
+            connection = self._take_healthy()
+        except Exception:
+            self._slots.release()
+            raise
+
+        with self._lock:
+            self._in_use += 1
+            self._peak_in_use = max(self._peak_in_use, self._in_use)
+            self._checkouts += 1
+            self._wait_time += time.monotonic() - start
+
+        return PooledConnection(self, connection)
+
+    def _take_healthy(self):
+        """Reuse an idle connection (pinging it if idle too long) or open a new one"""
+        while True:
+            with self._lock:
+                connection, last_used = self._idle.pop() if self._idle else (None, 0.0)
+
+            if connection is None:
+                return self._open()
+
+            if time.monotonic() - last_used < self.health_check_interval:
+                return connection
+
+            with self._lock:
+                self._health_checks += 1
+            try:
+                connection.ping(reconnect=False)
+                return connection
+            except Error:
+                self._discard(connection)
+
+    def _open(self):
+        """Open a new connection"""
+        # Autocommit so a reused connection never reads from a stale transaction snapshot
+        connection = mysql.connector.connect(autocommit=True, **self.config)
+        with self._lock:
+            self._created += 1
+        return connection
+
+    def _discard(self, connection):
+        """Close a connection that will not be reused"""
+        with self._lock:
+            self._discarded += 1
+        try:
+            connection.close()
+        except Error:
+            pass
+
+    def release(self, connection, reusable: bool = True):
+        """Return a checked-out connection to the pool"""
+        if reusable:
+            try:
+                if connection.in_transaction:
+                    connection.rollback()
+            except Error:
+                reusable = False
+
+        if reusable:
+            with self._lock:
+                self._idle.append((connection, time.monotonic()))
+        else:
+            self._discard(connection)
+
+        with self._lock:
+            self._in_use -= 1
+        self._slots.release()
+
+    def stats(self) -> Dict:
+        """Pool saturation and activity metrics"""
+        with self._lock:
+            return {
+                "pool_size": self.pool_size,
+                "in_use": self._in_use,
+                "idle": len(self._idle),
+                "peak_in_use": self._peak_in_use,
+                "saturation": round(self._in_use / self.pool_size, 3),
+                "checkouts": self._checkouts,
+                "waits": self._waits,
+                "timeouts": self._timeouts,
+                "avg_wait_ms": round(self._wait_time / self._checkouts * 1000, 3) if self._checkouts else 0,
+                "connections_created": self._created,
+                "connections_discarded": self._discarded,
+                "health_checks": self._health_checks,
+                "checkout_timeout": self.checkout_timeout,
+                "health_check_interval": self.health_check_interval
+            }
+
+
+_pools: Dict[Tuple, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(**overrides) -> ConnectionPool:
+    """
+    Return the shared pool for DB_CONFIG merged with any overrides
+
+    Example:
+        get_pool(database="youth_employment_db")
+    """
+    config = {**DB_CONFIG, **overrides}
+    key = tuple(sorted(config.items()))
+    with _pools_lock:
+        if key not in _pools:
+            name = f"{config['user']}@{config['host']}:{config['port']}/{config['database']}"
+            _pools[key] = ConnectionPool(name, config)
+        return _pools[key]
+
+
+def get_connection(**overrides) -> PooledConnection:
+    """
+    Check out a pooled connection; use as a context manager to return it
+
+    Example:
+        with get_connection() as connection:
+            cursor = connection.cursor(dictionary=True)
+    """
+    return get_pool(**overrides).get_connection()
+
+
+def pool_stats() -> Dict[str, Dict]:
+    """Metrics for every pool in this process"""
+    with _pools_lock:
+        pools = list(_pools.values())
+    return {pool.name: pool.stats() for pool in pools}
+
 
 def create_connection():
     try:
-        connection = mysql.connector.connect(
-            host="localhost",
-            user="root",
-            password="",
-            database="final_db",
-            port=3307
-        )
-
-        if connection.is_connected():
-            print("Connected to MySQL database successfully!")
-            return connection
+        connection = get_connection()
+        print("Connected to MySQL database successfully!")
+        return connection
 
     except Error as e:
         print("Error while connecting to MySQL:", e)
@@ -24,3 +263,4 @@ if __name__ == "__main__":
     conn = create_connection()
     if conn:
         conn.close()
+    print(pool_stats())
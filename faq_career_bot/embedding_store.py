@@ -0,0 +1,297 @@
+"""
+Persistent, content-addressed embedding cache for the knowledge base
+
+Embeddings are keyed by sha256(model name + chunk text) and stored per model
+as a memory-mappable float32 .npy matrix plus a JSON manifest listing the key
+of each row. Loading an unchanged knowledge base costs zero embedding calls;
+only new or edited chunks are sent to the embedding model. Building with
+prune=True also drops rows for chunks that were removed or edited, so the
+files track the current knowledge base instead of every version of it.
+
+QueryEmbeddingCache does the same for user queries: an in-process LRU keyed by
+model name + normalized query text, optionally backed by a SQLite file.
+
+Settings (environment variables):
+    QUERY_CACHE_SIZE     - in-memory query embeddings kept (default 4096, 0 disables)
+    QUERY_CACHE_PERSIST  - "true" to add the on-disk layer (default false)
+"""
+
+import os
+import re
+import json
+import sqlite3
+import hashlib
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+
+class EmbeddingStore:
+    """On-disk embedding cache for one embedding model"""
+
+    def __init__(self, cache_dir: str, model_name: str):
+        """
+        Open (or create) the store for a model
+
+        Args:
+            cache_dir: Directory holding one sub-directory per model
+            model_name: Embedding model name, part of every cache key
+        """
+        self.model_name = model_name
+        self.directory = os.path.join(cache_dir, re.sub(r'[^A-Za-z0-9_.-]+', '_', model_name))
+        self.matrix_path = os.path.join(self.directory, "embeddings.npy")
+        self.manifest_path = os.path.join(self.directory, "manifest.json")
+
+        self._lock = threading.Lock()
+        self._rows: Dict[str, int] = {}
+        self._matrix = None
+        self.last_hits = 0
+        self.last_misses = 0
+        self.last_pruned = 0
+        self._load()
+
+    def key(self, text: str) -> str:
+        """Content address of a text for this model"""
+        return hashlib.sha256(f"{self.model_name}\n{text}".encode("utf-8")).hexdigest()
+
+    def _load(self):
+        """Load the manifest and memory-map the embedding matrix"""
+        if not (os.path.exists(self.manifest_path) and os.path.exists(self.matrix_path)):
+            return
+
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            matrix = np.load(self.matrix_path, mmap_mode='r')
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Ignoring unreadable embedding cache at {self.directory}: {e}")
+            return
+
+        keys = manifest.get("keys", [])
+        if manifest.get("model") != self.model_name or len(keys) > len(matrix):
+            print(f"⚠️ Ignoring inconsistent embedding cache at {self.directory}")
+            return
+
+        self._matrix = matrix
+        self._rows = {key: row for row, key in enumerate(keys)}
+
+    def _save(self, matrix: np.ndarray, keys: List[str]):
+        """Atomically write the matrix, then the manifest that references it"""
+        os.makedirs(self.directory, exist_ok=True)
+
+        fd, tmp_matrix = tempfile.mkstemp(dir=self.directory, suffix=".npy")
+        with os.fdopen(fd, 'wb') as f:
+            np.save(f, matrix)
+        os.replace(tmp_matrix, self.matrix_path)
+
+        fd, tmp_manifest = tempfile.mkstemp(dir=self.directory, suffix=".json")
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({"model": self.model_name, "dim": int(matrix.shape[1]), "keys": keys}, f)
+        os.replace(tmp_manifest, self.manifest_path)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def get_or_embed(self, texts: List[str],
+                     embed_fn: Callable[[List[str]], List[List[float]]],
+                     prune: bool = False) -> np.ndarray:
+        """
+        Return embeddings for texts, embedding only those not already cached
+
+        Args:
+            texts: Texts to embed
+            embed_fn: Batch embedding function, e.g. embedding_model.embed_documents
+            prune: Drop cached rows whose key is not among texts (use for full rebuilds)
+
+        Returns:
+            float32 array of shape (len(texts), dim)
+        """
+        with self._lock:
+            keys = [self.key(text) for text in texts]
+
+            missing: Dict[str, str] = {}
+            for key, text in zip(keys, texts):
+                if key not in self._rows and key not in missing:
+                    missing[key] = text
+
+            wanted = set(keys)
+            stale = [key for key in self._rows if key not in wanted] if prune else []
+
+            self.last_hits = len(texts) - len(missing)
+            self.last_misses = len(missing)
+            self.last_pruned = len(stale)
+
+            if missing or stale:
+                stored_keys = [None] * len(self._rows)
+                for key, row in self._rows.items():
+                    stored_keys[row] = key
+                if stale:
+                    stored_keys = [key for key in stored_keys if key in wanted]
+
+                parts = []
+                if stored_keys:
+                    parts.append(np.asarray(self._matrix[[self._rows[key] for key in stored_keys]]))
+                if missing:
+                    parts.append(np.asarray(embed_fn(list(missing.values())), dtype=np.float32))
+                    stored_keys.extend(missing)
+                matrix = np.vstack(parts) if parts else np.zeros((0, 0), dtype=np.float32)
+
+                self._save(matrix, stored_keys)
+                self._matrix = np.load(self.matrix_path, mmap_mode='r')
+                self._rows = {key: row for row, key in enumerate(stored_keys)}
+
+            if not keys:
+                return np.zeros((0, 0), dtype=np.float32)
+            return np.asarray(self._matrix[[self._rows[key] for key in keys]], dtype=np.float32)
+
+
+class QueryEmbeddingCache:
+    """LRU cache of query embeddings with an optional SQLite second level"""
+
+    def __init__(self, model_name: str, max_entries: int = 4096, disk_path: Optional[str] = None):
+        """
+        Create an empty cache
+
+        Args:
+            model_name: Embedding model name, part of every cache key
+            max_entries: In-memory entries kept before evicting least recently used
+            disk_path: Optional SQLite file for the second level
+        """
+        self.model_name = model_name
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self._db = None
+        if disk_path:
+            os.makedirs(os.path.dirname(os.path.abspath(disk_path)), exist_ok=True)
+            self._db = sqlite3.connect(disk_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS query_embeddings (key TEXT PRIMARY KEY, vector BLOB)"
+            )
+            self._db.commit()
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def normalize(query: str) -> str:
+        """Case- and whitespace-insensitive form of a query"""
+        return " ".join(query.lower().split())
+
+    def key(self, query: str) -> str:
+        return f"{self.model_name}\n{self.normalize(query)}"
+
+    def _remember(self, key: str, vector: np.ndarray):
+        self._entries[key] = vector
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def get_or_embed(self, queries: List[str],
+                     embed_fn: Callable[[List[str]], List[List[float]]]) -> List[np.ndarray]:
+        """
+        Return float32 embeddings for queries, calling embed_fn only for uncached ones
+
+        Args:
+            queries: Query texts
+            embed_fn: Batch embedding function for the misses
+        """
+        keys = [self.key(query) for query in queries]
+        vectors: List[Optional[np.ndarray]] = [None] * len(queries)
+        missing: Dict[str, List[int]] = {}
+
+        with self._lock:
+            for i, key in enumerate(keys):
+                vector = self._entries.get(key)
+                if vector is None and self._db is not None:
+                    row = self._db.execute(
+                        "SELECT vector FROM query_embeddings WHERE key = ?", (key,)
+                    ).fetchone()
+                    if row:
+                        vector = np.frombuffer(row[0], dtype=np.float32)
+                        self.disk_hits += 1
+                        self._remember(key, vector)
+                if vector is None:
+                    missing.setdefault(key, []).append(i)
+                    continue
+                self.hits += 1
+                self._entries.move_to_end(key)
+                vectors[i] = vector
+
+        if missing:
+            texts = [queries[positions[0]] for positions in missing.values()]
+            embedded = [np.asarray(v, dtype=np.float32) for v in embed_fn(texts)]
+            with self._lock:
+                self.misses += len(missing)
+                # Repeats within one batch were embedded once, so they count as hits
+                self.hits += sum(len(positions) - 1 for positions in missing.values())
+                for (key, positions), vector in zip(missing.items(), embedded):
+                    if self.max_entries > 0:
+                        self._remember(key, vector)
+                    for i in positions:
+                        vectors[i] = vector
+                if self._db is not None:
+                    self._db.executemany(
+                        "INSERT OR REPLACE INTO query_embeddings (key, vector) VALUES (?, ?)",
+                        [(key, vector.tobytes()) for key, vector in zip(missing, embedded)]
+                    )
+                    self._db.commit()
+
+        return vectors
+
+    def stats(self) -> Dict:
+        """Cache size and hit-rate counters"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "persistent": self._db is not None,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0,
+                "evictions": self.evictions
+            }
+
+
+class LocalHashEmbeddings:
+    """
+    Deterministic, offline stand-in for an embedding model.
+
+    Hashes word tokens into a fixed number of buckets (feature hashing) and
+    L2-normalizes the result. Useful for tests and local development without
+    an OpenAI key; it exposes the same embed_documents/embed_query methods.
+    """
+
+    def __init__(self, dimensions: int = 256):
+        self.dimensions = dimensions
+        self.model = f"local-hash-{dimensions}"
+        self.documents_embedded = 0
+        self.queries_embedded = 0
+
+    def _embed(self, text: str) -> List[float]:
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        for token in re.findall(r'\w+', text.lower()):
+            digest = hashlib.md5(token.encode("utf-8")).digest()
+            bucket = int.from_bytes(digest[:4], "little") % self.dimensions
+            vector[bucket] += 1.0 if digest[4] & 1 else -1.0
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector /= norm
+        return vector.tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        self.documents_embedded += len(texts)
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        self.queries_embedded += 1
+        return self._embed(text)
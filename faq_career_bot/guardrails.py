@@ -0,0 +1,441 @@
+"""
+Content safety guardrails for LLM inputs and outputs
+
+Rule lists are compiled once. Each regex rule list sits behind a trigger-word
+prefilter: every rule starts with a word (or a group of alternative words)
+that must appear in the text, so a single scan with one trie-shaped regex
+finds which rules can possibly match and only those are evaluated. Keyword
+allow lists compile to one trie regex. Per-query cost therefore stays flat as
+the rule lists grow; run this module to see the microbenchmark.
+"""
+
+import re
+from typing import Dict, Iterable, List, Optional
+
+
+def trie_regex(words: Iterable[str]) -> str:
+    """
+    Regex alternation of literal words, factored into a trie
+
+    e.g. ["car", "career", "cv"] -> c(?:ar(?:eer)?|v)
+    The regex engine walks one branch per character instead of trying every word.
+    """
+    trie: Dict = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node: Dict) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if "" in node:
+            body = "(?:" + body + ")?"
+        return body
+
+    return build(trie)
+
+
+_LEADING_GROUP = re.compile(r'\\b\(([^()]*)\)')
+_LEADING_WORD = re.compile(r'\\b([a-z]+)(?:\\b|\\s)')
+_FIRST_WORD = re.compile(r'[a-z]+')
+
+
+def _has_top_level_alternation(pattern: str) -> bool:
+    """True if pattern contains a "|" outside any group or character class"""
+    depth = 0
+    in_class = False
+    escaped = False
+    for char in pattern:
+        if escaped:
+            escaped = False
+        elif char == "\\":
+            escaped = True
+        elif in_class:
+            in_class = char != "]"
+        elif char == "[":
+            in_class = True
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == "|" and depth == 0:
+            return True
+    return False
+
+
+def _trigger_words(pattern: str) -> Optional[List[str]]:
+    """
+    Words one of which must begin any match of pattern, or None if unknown
+
+    Understands rules starting with \\b(word|word ...) or \\bword. Patterns with
+    a top-level alternation (a|b) can match through any branch, so they get no
+    trigger and are always evaluated.
+    """
+    if _has_top_level_alternation(pattern):
+        return None
+
+    group = _LEADING_GROUP.match(pattern)
+    if group:
+        # The group must end on a word boundary, else a trigger could be a word prefix
+        if pattern[group.end():group.end() + 2] not in ("\\b", "\\s"):
+            return None
+        words = []
+        for alternative in group.group(1).split("|"):
+            word = _FIRST_WORD.match(alternative)
+            # Only a whole leading word is a safe trigger
+            if not word or alternative[word.end():word.end() + 1] not in ("", " ", "\\"):
+                return None
+            words.append(word.group())
+        return words
+
+    word = _LEADING_WORD.match(pattern)
+    return [word.group(1)] if word else None
+
+
+class RuleSet:
+    """Compiled regex rule list with a single-pass trigger-word prefilter"""
+
+    def __init__(self, patterns: Iterable[str], flags: int = re.IGNORECASE):
+        self.patterns = list(patterns)
+        self._rules = [re.compile(pattern, flags) for pattern in self.patterns]
+
+        # Rules without a recognisable trigger word are always evaluated
+        self._always: List[int] = []
+        self._rules_by_word: Dict[str, List[int]] = {}
+        for position, pattern in enumerate(self.patterns):
+            words = _trigger_words(pattern)
+            if words is None:
+                self._always.append(position)
+                continue
+            for word in words:
+                self._rules_by_word.setdefault(word, []).append(position)
+
+        self._trigger = None
+        if self._rules_by_word:
+            self._trigger = re.compile(r'\b(' + trie_regex(self._rules_by_word) + r')\b', flags)
+
+    def search(self, text: str) -> bool:
+        """True if any rule matches text"""
+        candidates = set(self._always)
+        if self._trigger is not None:
+            for match in self._trigger.finditer(text):
+                candidates.update(self._rules_by_word[match.group(1).lower()])
+        return any(self._rules[position].search(text) for position in sorted(candidates))
+
+
+class KeywordSet:
+    """Substring keyword list compiled into one trie regex"""
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords = list(keywords)
+        self._pattern = re.compile(trie_regex(self.keywords)) if self.keywords else None
+
+    def search(self, text: str) -> bool:
+        """True if any keyword occurs in text (same as any(k in text for k in keywords))"""
+        return bool(self._pattern and self._pattern.search(text))
+
+
+# Characters that are neither alphanumeric nor whitespace (\w also matches "_")
+_SPECIAL_CHARS = re.compile(r'[^\w\s]|_')
+
+
+class ContentGuardrails:
+    """Content safety guardrails for LLM inputs and outputs"""
+
+    # Inappropriate content patterns
+    BLOCKED_PATTERNS = [
+        r'\b(hack|exploit|bypass|jailbreak)\b.*\b(system|security|filter)\b',
+        r'\b(ignore|disregard|forget)\b.*\b(instructions|rules|guidelines)\b',
+        r'\bpretend\s+to\s+be\b',
+        r'\bact\s+as\s+if\b.*\b(no\s+restrictions|unrestricted)\b',
+        r'\b(violent|harmful|illegal|unethical)\s+(content|instructions|advice)\b',
+    ]
+
+    # Off-topic patterns (non-career related)
+    OFF_TOPIC_PATTERNS = [
+        r'\b(make|build|create|plan|organize)\b.*\b(tour|trip|vacation|holiday|travel)\b(?!.*\b(career|job|industry)\b)',
+        r'\b(make|build|create|how to)\b.*\b(pencil|pen|desk|chair|table|furniture)\b',
+        r'\b(recipe|cook|bake|food|meal|dish)\b(?!.*\b(career|job|chef|culinary)\b)',
+        r'\b(game|movie|music|song|dance|entertainment)\b(?!.*\b(career|job|industry|professional)\b)',
+        r'\b(sports|football|cricket|basketball|athletics)\b(?!.*\b(career|job|coaching|professional)\b)',
+        r'\b(weather|temperature|climate|forecast)\b(?!.*\b(career|job|meteorology)\b)',
+        r'\b(joke|funny|comedy|humor|meme)\b(?!.*\b(career|workplace|professional)\b)',
+        r'\b(shopping|buying|purchase)\b.*\b(clothes|shoes|gadgets)\b(?!.*\b(career|job|retail)\b)',
+        r'\b(medical|health|disease|treatment)\b.*\b(advice|symptoms|cure)\b(?!.*\b(career|healthcare|medical career)\b)',
+        r'\b(relationship|dating|love|marriage)\b(?!.*\b(career|workplace|professional)\b)',
+    ]
+
+    # Career-focused keywords (allow list)
+    ALLOWED_TOPICS = [
+        'career', 'job', 'skill', 'resume', 'cv', 'interview', 'education',
+        'course', 'learning', 'training', 'salary', 'work', 'experience',
+        'professional', 'development', 'growth', 'opportunity', 'role',
+        'position', 'company', 'industry', 'qualification', 'certification',
+        'internship', 'employment', 'workplace', 'recruiter', 'hiring'
+    ]
+
+    # System-level instructions that might leak into output
+    SYSTEM_PATTERNS = [
+        r'\[SYSTEM\].*?\[\/SYSTEM\]',
+        r'<\|im_start\|>.*?<\|im_end\|>',
+        r'###\s*Instruction:.*?###',
+    ]
+
+    # Harmful instructions in output
+    HARMFUL_OUTPUT_PATTERNS = [
+        r'\b(how\s+to|instructions\s+for)\s+(hack|exploit|steal|harm)\b',
+        r'\b(illegal|unethical)\s+(activity|action|method)\b',
+    ]
+
+    @classmethod
+    def compile(cls):
+        """(Re)build the compiled matchers; call after changing a rule list"""
+        cls._blocked = RuleSet(cls.BLOCKED_PATTERNS)
+        cls._off_topic = RuleSet(cls.OFF_TOPIC_PATTERNS)
+        cls._allowed = KeywordSet(cls.ALLOWED_TOPICS)
+        cls._system = [re.compile(pattern, re.IGNORECASE | re.DOTALL) for pattern in cls.SYSTEM_PATTERNS]
+        cls._harmful = RuleSet(cls.HARMFUL_OUTPUT_PATTERNS, flags=0)
+
+    @staticmethod
+    def validate_input(query: str) -> tuple[bool, str]:
+        """Validate user input query
+        Returns: (is_valid, error_message)
+        """
+        if not query or not query.strip():
+            return False, "Query cannot be empty"
+
+        if len(query) > 2000:
+            return False, "Query too long. Please keep it under 2000 characters"
+
+        query_lower = query.lower()
+
+        # Check for blocked patterns
+        if ContentGuardrails._blocked.search(query_lower):
+            return False, "Your query contains inappropriate content. Please ask career-related questions only"
+
+        # Check for off-topic patterns
+        if ContentGuardrails._off_topic.search(query_lower):
+            return False, "I'm a career guidance AI assistant. Please ask questions related to your career, job search, skills, education, or professional development."
+
+        # Check for excessive special characters (potential injection)
+        special_char_ratio = len(_SPECIAL_CHARS.findall(query)) / len(query)
+        if special_char_ratio > 0.3:
+            return False, "Query contains too many special characters"
+
+        # Enforce career-related topics for longer queries
+        has_career_topic = ContentGuardrails._allowed.search(query_lower)
+        if not has_career_topic and len(query) > 30:
+            return False, "I specialize in career guidance and professional development. Please ask questions about jobs, skills, education, interviews, resume building, or career planning."
+
+        return True, ""
+
+    @staticmethod
+    def sanitize_output(content: str) -> str:
+        """Sanitize LLM output before sending to user"""
+        if not content:
+            return content
+
+        # Remove potential prompt injection attempts in output
+        sanitized = content
+
+        # Remove system-level instructions that might have leaked
+        for pattern in ContentGuardrails._system:
+            sanitized = pattern.sub('', sanitized)
+
+        # Ensure output stays professional
+        if len(sanitized) > 5000:
+            sanitized = sanitized[:5000] + "\n\n[Response truncated for length]"
+
+        return sanitized.strip()
+
+    @staticmethod
+    def check_output_safety(content: str) -> bool:
+        """Check if output is safe to send"""
+        if not content:
+            return True
+
+        # Block outputs with harmful instructions
+        return not ContentGuardrails._harmful.search(content.lower())
+
+
+ContentGuardrails.compile()
+
+
+# Start marker of each leaked-instruction span and the end marker that closes it
+_SPAN_START = re.compile(r'(\[SYSTEM\])|(<\|im_start\|>)|(###\s*Instruction:)', re.IGNORECASE)
+_SPAN_END = [
+    re.compile(r'\[\/SYSTEM\]', re.IGNORECASE),
+    re.compile(r'<\|im_end\|>', re.IGNORECASE),
+    re.compile(r'###'),
+]
+_MAX_END_MARKER = len("<|im_end|>")
+# A word character: judged text must not end in the middle of a word
+_WORD_CHAR = re.compile(r'\w')
+_NON_WORD_CHAR = re.compile(r'\W')
+# Text that could still grow into a start marker once more chunks arrive
+_PARTIAL_START = re.compile(
+    r'\[(?:s(?:y(?:s(?:t(?:e(?:m)?)?)?)?)?)?'
+    r'|<(?:\|(?:i(?:m(?:_(?:s(?:t(?:a(?:r(?:t(?:\|)?)?)?)?)?)?)?)?)?)?'
+    r'|###\s*(?:i(?:n(?:s(?:t(?:r(?:u(?:c(?:t(?:i(?:o(?:n)?)?)?)?)?)?)?)?)?)?)?|#{1,3}',
+    re.IGNORECASE
+)
+
+
+class StreamingOutputFilter:
+    """
+    Incremental form of sanitize_output + check_output_safety for streamed responses
+
+    Each chunk is scanned once: leaked [SYSTEM]...[/SYSTEM], <|im_start|>...<|im_end|>
+    and ### Instruction: ... ### spans are removed even when they straddle chunk
+    boundaries, and the harmful-output rules only look at the new text plus an
+    overlap window of already-checked text. Work is linear in response length.
+
+    Text is judged (and emitted) only up to its last non-word character, so a
+    word split across chunks ("hack" + "athon") is never checked half-finished;
+    the trailing partial word waits for the next chunk or finish().
+    """
+
+    def __init__(self, overlap: int = 200):
+        """
+        Args:
+            overlap: Characters of previously emitted text re-checked with each
+                chunk, so a harmful phrase split across chunks is still caught
+        """
+        self.overlap = overlap
+        self.safe = True
+        self._pending = ""
+        self._unjudged = ""
+        self._checked_tail = ""
+        self._open_end = None
+        self._end_from = 0
+
+    def feed(self, chunk: str) -> str:
+        """
+        Add a streamed chunk
+
+        Returns:
+            Text that is now safe to emit (may be empty while a span is open).
+            Check `safe` before sending it.
+        """
+        self._pending += chunk
+        return self._check(self._drain(final=False), final=False)
+
+    def finish(self) -> str:
+        """Flush held-back text at the end of the stream (unclosed spans are kept, as in sanitize_output)"""
+        return self._check(self._drain(final=True), final=True)
+
+    def _drain(self, final: bool) -> str:
+        emitted = []
+        while self._pending:
+            if self._open_end is not None:
+                # Inside a span: only look for its end marker in text not searched yet
+                end = self._open_end.search(self._pending, self._end_from)
+                if end is None:
+                    if final:
+                        emitted.append(self._pending)
+                        self._pending = ""
+                        self._open_end = None
+                    else:
+                        self._end_from = max(self._end_from, len(self._pending) - _MAX_END_MARKER)
+                    break
+                self._pending = self._pending[end.end():]
+                self._open_end = None
+                continue
+
+            start = _SPAN_START.search(self._pending)
+            if start is None:
+                cut = len(self._pending)
+                if not final:
+                    # Hold back a trailing partial marker such as "[SYS"
+                    for position in range(max(0, cut - 20), cut):
+                        if self._pending[position] in "[<#" and \
+                                _PARTIAL_START.fullmatch(self._pending, position):
+                            cut = position
+                            break
+                emitted.append(self._pending[:cut])
+                self._pending = self._pending[cut:]
+                break
+
+            # Keep the start marker until the span closes: unclosed spans are emitted as-is
+            emitted.append(self._pending[:start.start()])
+            self._pending = self._pending[start.start():]
+            self._open_end = _SPAN_END[start.lastindex - 1]
+            self._end_from = start.end() - start.start()
+        return "".join(emitted)
+
+    def _check(self, text: str, final: bool) -> str:
+        text = self._unjudged + text
+        cut = len(text)
+        if not final:
+            # Judge only up to a real word boundary; keep the trailing partial word
+            while cut and _WORD_CHAR.match(text, cut - 1):
+                cut -= 1
+        self._unjudged = text[cut:]
+        text = text[:cut]
+
+        if text and self.safe:
+            window = self._checked_tail + text
+            if not ContentGuardrails.check_output_safety(window):
+                self.safe = False
+            self._checked_tail = self._tail(window)
+        return text
+
+    def _tail(self, window: str) -> str:
+        """Last `overlap` characters of window, starting at a word boundary"""
+        start = len(window) - self.overlap
+        if start <= 0:
+            return window
+        if _WORD_CHAR.match(window, start - 1):
+            # Drop the partial word at the left edge: "somehow" must not become "how"
+            boundary = _NON_WORD_CHAR.search(window, start)
+            start = boundary.start() if boundary else len(window)
+        return window[start:]
+
+
+def _benchmark():
+    """Per-query cost of per-pattern re.search vs the compiled matchers as rule lists grow"""
+    import random
+    import string
+    import time
+
+    rng = random.Random(0)
+
+    def word():
+        return "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 9)))
+
+    queries = [
+        "How do I prepare for a software engineering interview at a product company?",
+        "What skills should I learn to move from marketing into data analytics?",
+        "Can you review my resume summary for a junior web developer role please",
+        "plan a vacation trip to the beach this summer with friends",
+    ] * 25
+
+    print(f"{'rules':>6} {'per-pattern re.search':>22} {'compiled':>10}   (µs per query)")
+    for size in (10, 100, 1000, 5000):
+        patterns = [
+            rf'\b({word()}|{word()})\b.*\b({word()}|{word()})\b' for _ in range(size)
+        ]
+        keywords = [word() for _ in range(size)]
+
+        start = time.perf_counter()
+        for query in queries:
+            any(re.search(pattern, query, re.IGNORECASE) for pattern in patterns)
+            any(keyword in query for keyword in keywords)
+        naive = (time.perf_counter() - start) / len(queries) * 1e6
+
+        rules, allowed = RuleSet(patterns), KeywordSet(keywords)
+        start = time.perf_counter()
+        for query in queries:
+            rules.search(query)
+            allowed.search(query)
+        compiled = (time.perf_counter() - start) / len(queries) * 1e6
+
+        print(f"{size:>6} {naive:>22.1f} {compiled:>10.1f}")
+
+
+if __name__ == "__main__":
+    _benchmark()
@@ -1,13 +1,774 @@
 """
 Intelligent Job Matching System with Match Percentage
 Analyzes user skills against job requirements and provides detailed recommendations
+
+Skill names are compared after normalization and alias resolution: a JSON file
+mapping each canonical skill to its aliases (e.g. "JavaScript": ["JS"]) is
+loaded once from SKILL_ALIASES_FILE (default skill_aliases.json next to this
+module), and job and user skills are resolved to canonical names on ingest.
+Free-form names that are neither ("Strong Python 3 skills") are resolved
+through a trigram index over the known names (see FuzzySkillIndex), tuned by
+FUZZY_SKILL_THRESHOLD (default 0.85; above 1 disables fuzzy resolution) and
+FUZZY_SKILL_MIN_COVERAGE (default 0.6).
 """
 
-import mysql.connector
 from mysql.connector import Error
-from typing import List, Dict, Tuple
+from typing import List, Dict, Tuple, Optional, Iterable, Iterator
+import os
+import json
 import re
-from collections import Counter
+import time
+import heapq
+import threading
+from array import array
+from functools import lru_cache
+from itertools import islice
+from collections import Counter, OrderedDict
+
+from db import DB_CONFIG, get_connection
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+    print("⚠️ NumPy not available - using per-job scoring. Install with: pip install numpy")
+
+try:
+    from scipy import sparse
+    SCIPY_AVAILABLE = True
+except ImportError:
+    SCIPY_AVAILABLE = False
+
+
+@lru_cache(maxsize=65536)
+def _normalize_skill(skill: str) -> str:
+    """Normalize a skill name; memoized since the same names recur on every request"""
+    return skill.lower().strip().replace('-', '').replace('.', '')
+
+
+def load_skill_aliases(path: Optional[str]) -> Dict[str, str]:
+    """
+    Load a skill alias file
+    
+    Args:
+        path: JSON file mapping canonical skill names to lists of aliases
+    
+    Returns:
+        Normalized alias to normalized canonical name (empty if the file is missing or invalid)
+    """
+    if not path or not os.path.exists(path):
+        return {}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            table = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Ignoring unreadable skill alias file {path}: {e}")
+        return {}
+    
+    aliases = {}
+    for canonical, names in table.items():
+        target = _normalize_skill(canonical)
+        aliases[target] = target
+        for name in names:
+            aliases[_normalize_skill(name)] = target
+    return aliases
+
+
+class FuzzySkillIndex:
+    """
+    Trigram inverted index resolving free-form skill text to a known skill.
+    
+    Each known name is split into words and each word padded ("  sql ") and
+    cut into trigrams. A text resolves to a name only if
+    
+      - the name is long enough to be distinctive (MIN_NAME_LENGTH characters
+        and MIN_NAME_TRIGRAMS trigrams; "go", "ml" or "c#" only ever match
+        exactly or via an alias),
+      - at least `threshold` of the name's trigrams occur in the text,
+      - the name covers at least `min_coverage` of the text's trigrams once
+        filler words ("strong", "experience", "with", ...) are ignored, and
+      - no other skill also clears the threshold; "Java and JavaScript" or
+        "Tableau or Power BI" name several skills and stay unresolved. A name
+        whose words are all part of another candidate's ("react" inside
+        "react native") does not count as a rival.
+    
+    So "Strong Python 3 skills" resolves to python, "Go to market strategy"
+    resolves to nothing. Only names sharing a trigram with the text are scored.
+    """
+    
+    _WORD = re.compile(r'[a-z0-9#+]+')
+    MIN_NAME_LENGTH = 4
+    MIN_NAME_TRIGRAMS = 3
+    FILLER_WORDS = frozenset([
+        "a", "an", "and", "or", "the", "of", "in", "on", "with", "to", "for", "using", "etc",
+        "strong", "solid", "good", "excellent", "great", "deep", "basic", "advanced", "expert",
+        "proficient", "proficiency", "knowledge", "understanding", "familiar", "familiarity",
+        "experience", "experienced", "hands", "handson", "working", "skill", "skills", "ability",
+        "year", "years", "plus", "preferred", "required"
+    ])
+    
+    def __init__(self, names: Dict[str, str], threshold: float = 0.85, min_coverage: float = 0.6):
+        """
+        Build the index
+        
+        Args:
+            names: Normalized known name (canonical or alias) to normalized canonical name
+            threshold: Minimum fraction of a name's trigrams the text must contain
+            min_coverage: Minimum fraction of the text's (non-filler) trigrams the name must cover
+        """
+        self.threshold = threshold
+        self.min_coverage = min_coverage
+        self.names: List[str] = []
+        self.canonical: List[str] = []
+        self.words: List[frozenset] = []
+        self.trigram_counts: List[int] = []
+        self.postings: Dict[str, List[int]] = {}
+        
+        for name, canonical in names.items():
+            trigrams = self.trigrams(name)
+            if len(name) < self.MIN_NAME_LENGTH or len(trigrams) < self.MIN_NAME_TRIGRAMS:
+                continue
+            entry = len(self.names)
+            self.names.append(name)
+            self.canonical.append(canonical)
+            self.words.append(frozenset(self._WORD.findall(name)))
+            self.trigram_counts.append(len(trigrams))
+            for trigram in trigrams:
+                self.postings.setdefault(trigram, []).append(entry)
+    
+    @classmethod
+    def trigrams(cls, text: str, skip: frozenset = frozenset()) -> set:
+        """Trigrams of each word of text (except words in skip), padded so short words still produce some"""
+        grams = set()
+        for word in cls._WORD.findall(text):
+            if word in skip:
+                continue
+            padded = f"  {word} "
+            grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+        return grams
+    
+    def resolve(self, text: str) -> Optional[str]:
+        """
+        Canonical name of the single known skill the text refers to
+        
+        Returns:
+            The canonical name, or None if no skill or more than one skill matches
+        """
+        if self.threshold > 1:
+            return None
+        
+        text_trigrams = self.trigrams(text, skip=self.FILLER_WORDS)
+        if not text_trigrams:
+            return None
+        
+        shared = Counter()
+        for trigram in text_trigrams:
+            shared.update(self.postings.get(trigram, ()))
+        
+        candidates = [entry for entry, count in shared.items()
+                      if count / self.trigram_counts[entry] >= self.threshold]
+        # "react" is part of "react native", not a competing skill
+        candidates = [entry for entry in candidates
+                      if not any(self.words[entry] < self.words[other] for other in candidates)]
+        if len({self.canonical[entry] for entry in candidates}) != 1:
+            return None
+        
+        coverage = max(shared[entry] for entry in candidates) / len(text_trigrams)
+        return self.canonical[candidates[0]] if coverage >= self.min_coverage else None
+
+
+SKILL_ALIASES = load_skill_aliases(
+    os.getenv("SKILL_ALIASES_FILE", os.path.join(os.path.dirname(os.path.abspath(__file__)), "skill_aliases.json"))
+)
+FUZZY_SKILLS = FuzzySkillIndex(
+    SKILL_ALIASES,
+    threshold=float(os.getenv("FUZZY_SKILL_THRESHOLD", "0.85")),
+    min_coverage=float(os.getenv("FUZZY_SKILL_MIN_COVERAGE", "0.6"))
+)
+
+
+@lru_cache(maxsize=65536)
+def _canonical_skill(skill: str) -> str:
+    """
+    Normalized skill name with aliases resolved to their canonical skill
+    
+    Unknown names fall back to the fuzzy index; memoized, so each distinct
+    string is resolved once per process.
+    """
+    normalized = _normalize_skill(skill)
+    canonical = SKILL_ALIASES.get(normalized)
+    if canonical is None:
+        canonical = FUZZY_SKILLS.resolve(normalized) or normalized
+    return canonical
+
+
+class SkillVocabulary:
+    """
+    Process-wide interning of normalized skill names to small integer ids.
+    
+    Ids are assigned the first time a job requiring the skill is loaded and
+    never change, so job requirements can be stored as compact integer arrays
+    and matched with integer lookups instead of string comparisons.
+    """
+    
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self.names: List[str] = []
+        self._lock = threading.Lock()
+    
+    def intern(self, skill: str) -> int:
+        """Return the id of a normalized skill, assigning a new one if needed"""
+        skill_id = self._ids.get(skill)
+        if skill_id is None:
+            with self._lock:
+                skill_id = self._ids.get(skill)
+                if skill_id is None:
+                    skill_id = len(self.names)
+                    self.names.append(skill)
+                    self._ids[skill] = skill_id
+        return skill_id
+    
+    def lookup(self, skill: str) -> Optional[int]:
+        """Id of a normalized skill, or None if no job has required it"""
+        return self._ids.get(skill)
+    
+    def encode_map(self, skill_map: Dict[str, object]) -> Dict[int, object]:
+        """Re-key a normalized skill map by skill id, dropping skills no job requires"""
+        ids = self._ids
+        return {ids[skill]: value for skill, value in skill_map.items() if skill in ids}
+    
+    def __len__(self) -> int:
+        return len(self.names)
+
+
+skill_vocabulary = SkillVocabulary()
+
+
+class JobSkillIndex:
+    """
+    In-memory inverted index from skill id to the jobs that require it.
+    
+    Jobs are addressed by their position in the job list the index was built
+    from. Each job's requirements are kept as an array('i') of skill ids from
+    the shared SkillVocabulary. Jobs sharing an (experienceLevel, careerTrack)
+    pair are grouped so that jobs without any skill overlap can be ranked per
+    group instead of one by one.
+    """
+    
+    def __init__(self, engine: 'JobMatchingEngine', jobs: List[Dict],
+                 parsed_skills: Optional[List[Tuple[List[str], List[str]]]] = None):
+        """
+        Build the index from raw job rows
+        
+        Args:
+            engine: Matching engine providing skill parsing and normalization
+            jobs: Job rows as returned by get_all_jobs()
+            parsed_skills: Optional pre-parsed (required, normalized) skills per job
+        """
+        if parsed_skills is None:
+            parsed_skills = [engine.parse_job_skills(job['requiredSkills']) for job in jobs]
+        
+        self.jobs = jobs
+        self.vocabulary = skill_vocabulary
+        self.required_skills: List[List[str]] = []
+        self.skill_ids: List[array] = []
+        self.job_contexts: List[Tuple[str, str]] = []
+        self.postings: Dict[int, List[int]] = {}
+        self.context_groups: Dict[Tuple[str, str], List[int]] = {}
+        
+        for position, (job, (required, normalized)) in enumerate(zip(jobs, parsed_skills)):
+            self.required_skills.append(required)
+            # Requirement order and duplicates are kept; scoring depends on both
+            skill_ids = array('i', [self.vocabulary.intern(skill) for skill in normalized])
+            self.skill_ids.append(skill_ids)
+            
+            for skill_id in set(skill_ids):
+                self.postings.setdefault(skill_id, []).append(position)
+
+            context = (job['experienceLevel'], job['careerTrack'])
+            self.job_contexts.append(context)
+            self.context_groups.setdefault(context, []).append(position)
+        
+        # Sparse encoding for vectorized scoring
+        self.scoring_matrix = JobScoringMatrix(engine, self) if NUMPY_AVAILABLE else None
+    
+    def candidates(self, user_skill_ids: Iterable[int]) -> List[int]:
+        """Positions of jobs sharing at least one skill id with the user, in job order"""
+        positions = set()
+        for skill_id in user_skill_ids:
+            positions.update(self.postings.get(skill_id, ()))
+        return sorted(positions)
+
+
+class JobScoringMatrix:
+    """
+    Batch scoring engine over a JobSkillIndex.
+    
+    Jobs are encoded once as a sparse job x skill-id matrix (one entry per
+    required skill, in the job's own order) plus integer-coded experience
+    level and career track columns. Scoring a user is then a couple of
+    matrix-vector products and table lookups, producing exactly the same
+    floating point scores as calculate_skill_match and the 0.6/0.25/0.15
+    weighting.
+    """
+    
+    def __init__(self, engine: 'JobMatchingEngine', index: JobSkillIndex):
+        """
+        Encode the indexed jobs
+        
+        Args:
+            engine: Matching engine the index was built for
+            index: Index holding the parsed skills and contexts of each job
+        """
+        # Columns are vocabulary skill ids
+        self.vocabulary = index.vocabulary
+        self.n_skills = len(self.vocabulary)
+        indptr = [0]
+        indices = array('i')
+        for skill_ids in index.skill_ids:
+            indices.extend(skill_ids)
+            indptr.append(len(indices))
+        
+        self.n_jobs = len(index.skill_ids)
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.frombuffer(indices, dtype=np.int32).astype(np.int64)
+        self.row_lengths = np.diff(self.indptr).astype(np.float64)
+        self.entry_rows = np.repeat(np.arange(self.n_jobs), np.diff(self.indptr))
+        
+        # Entries are kept in requirement order (duplicates included) so row sums
+        # accumulate in the same order as the per-job Python loop
+        self.matrix = None
+        if SCIPY_AVAILABLE:
+            self.matrix = sparse.csr_matrix(
+                (np.ones(len(indices)), self.indices, self.indptr),
+                shape=(self.n_jobs, self.n_skills)
+            )
+        
+        self.levels, self.level_codes = self._encode([level for level, _ in index.job_contexts])
+        self.tracks, self.track_codes = self._encode([track for _, track in index.job_contexts])
+    
+    @staticmethod
+    def _encode(values: List) -> Tuple[List, 'np.ndarray']:
+        """Integer-code a column, returning (distinct values, codes)"""
+        codes_by_value = {}
+        codes = [codes_by_value.setdefault(value, len(codes_by_value)) for value in values]
+        return list(codes_by_value), np.asarray(codes, dtype=np.int64)
+    
+    def _matvec(self, vector: 'np.ndarray') -> 'np.ndarray':
+        """Multiply the job x skill matrix by a skill vector"""
+        if self.matrix is not None:
+            return self.matrix @ vector
+        return np.bincount(self.entry_rows, weights=vector[self.indices], minlength=self.n_jobs)
+    
+    def _matmat(self, matrix: 'np.ndarray') -> 'np.ndarray':
+        """Multiply the job x skill matrix by a skill x user matrix"""
+        if self.matrix is not None:
+            return np.asarray(self.matrix @ matrix)
+        columns = [self._matvec(column) for column in matrix.T]
+        return np.column_stack(columns) if columns else np.zeros((self.n_jobs, 0))
+    
+    def score(self, engine: 'JobMatchingEngine', user_skill_map: Dict[str, str],
+              user_experience: str = None, user_track: str = None) -> 'np.ndarray':
+        """
+        Compute the overall match score of every job for one user
+        
+        Args:
+            engine: Matching engine providing weights and context scoring
+            user_skill_map: Normalized user skill name to proficiency
+            user_experience: User's experience level (optional)
+            user_track: User's preferred career track (optional)
+        
+        Returns:
+            Array of overall scores in job order
+        """
+        return self.score_many(engine, [user_skill_map], user_experience, user_track)[0]
+    
+    def score_many(self, engine: 'JobMatchingEngine', user_skill_maps: List[Dict[str, str]],
+                   user_experience: str = None, user_track: str = None) -> 'np.ndarray':
+        """
+        Compute overall match scores for several users at once
+        
+        One sparse matrix product scores every user against every job; row u
+        holds the same scores score() would return for user_skill_maps[u].
+        
+        Returns:
+            (users, jobs) array of overall scores
+        """
+        n_users = len(user_skill_maps)
+        has_skill = np.zeros((self.n_skills, n_users))
+        skill_weights = np.zeros((self.n_skills, n_users))
+        for user, user_skill_map in enumerate(user_skill_maps):
+            for skill_id, proficiency in self.vocabulary.encode_map(user_skill_map).items():
+                # Skills first seen after this matrix was built belong to no indexed job
+                if skill_id < self.n_skills:
+                    has_skill[skill_id, user] = 1.0
+                    skill_weights[skill_id, user] = engine.proficiency_weights.get(proficiency, 0.5)
+        
+        # (jobs, users)
+        matched_count = self._matmat(has_skill)
+        proficiency_sum = self._matmat(skill_weights)
+        row_lengths = self.row_lengths[:, None]
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            base_score = matched_count / row_lengths
+            proficiency_bonus = np.where(
+                matched_count > 0, proficiency_sum / matched_count * 0.2, 0.0
+            )
+            skill_score = np.where(
+                row_lengths > 0, np.minimum(base_score + proficiency_bonus, 1.0), 0.0
+            )
+        
+        experience_table = np.array([
+            engine.calculate_experience_match(user_experience, level) if user_experience else 0.5
+            for level in self.levels
+        ])
+        track_table = np.array([
+            engine.calculate_track_match(user_track, track) if user_track else 0.5
+            for track in self.tracks
+        ])
+        
+        scores = (
+            skill_score * 0.6 +
+            experience_table[self.level_codes][:, None] * 0.25 +
+            track_table[self.track_codes][:, None] * 0.15
+        )
+        return np.ascontiguousarray(scores.T)
+    
+    @staticmethod
+    def top_positions(scores: 'np.ndarray', top_n: int) -> List[int]:
+        """
+        Pick the top-N positions by score with np.argpartition
+        
+        Ties are broken by position so the order matches a stable sort on score.
+        """
+        top_n = min(max(top_n, 0), len(scores))
+        if top_n == 0:
+            return []
+        
+        threshold = scores[np.argpartition(-scores, top_n - 1)[top_n - 1]]
+        selected = np.flatnonzero(scores >= threshold)
+        ordered = selected[np.lexsort((selected, -scores[selected]))]
+        return ordered[:top_n].tolist()
+
+
+class JobCatalog:
+    """
+    Process-level cache of the Jobs table.
+    
+    Only the scoring projection (JOB_COLUMNS) is held for every job; rows are
+    loaded once and each job's requiredSkills is parsed once. Display columns
+    (DETAIL_COLUMNS: title, company, description, ...) are fetched by primary
+    key for the jobs that make it into a result, via get_details(), and kept
+    in a small LRU.
+    
+    Refreshes are throttled to one every refresh_interval seconds and first
+    probe COUNT(*)/MAX(updatedAt); only rows at or past the updatedAt
+    high-water mark are pulled (the mark's own tick is always re-read), and
+    a primary key sweep runs only when the row count shows inserts or
+    deletes the high-water mark cannot see.
+    Every change bumps `version`.
+    
+    Cached details are dropped when their job's scoring row changes. Writes
+    that touch only display columns without bumping updatedAt are invisible
+    to the probe; clear_details() (via invalidate_jobs) flushes them.
+    """
+    
+    JOB_COLUMNS = "id, requiredSkills, experienceLevel, careerTrack, updatedAt"
+    DETAIL_COLUMNS = "id, title, company, location, jobType, description"
+    
+    def __init__(self, engine: 'JobMatchingEngine', refresh_interval: float = 5.0,
+                 detail_cache_size: int = 1024):
+        """
+        Initialize an empty catalog
+        
+        Args:
+            engine: Matching engine providing DB config and skill parsing
+            refresh_interval: Minimum seconds between change probes
+            detail_cache_size: Jobs whose display columns are kept in memory
+        """
+        self.engine = engine
+        self.refresh_interval = refresh_interval
+        self.detail_cache_size = detail_cache_size
+        self.version = 0
+        self.loaded = False
+        
+        self._jobs: Dict[int, Dict] = {}
+        self._details: "OrderedDict[int, Dict]" = OrderedDict()
+        self.detail_hits = 0
+        self.detail_misses = 0
+        self._parsed_skills: Dict[int, Tuple[List[str], List[str]]] = {}
+        self._high_water = None
+        self._last_checked = 0.0
+        self._index: Optional[JobSkillIndex] = None
+        self._lock = threading.RLock()
+    
+    def refresh(self, force: bool = False) -> bool:
+        """
+        Pull changed rows from the database
+        
+        Args:
+            force: Probe even if the refresh interval has not elapsed
+        
+        Returns:
+            True if the catalog changed
+        """
+        with self._lock:
+            now = time.monotonic()
+            if self.loaded and not force and now - self._last_checked < self.refresh_interval:
+                return False
+            self._last_checked = now
+            
+            try:
+                with get_connection(**self.engine.db_config) as connection:
+                    cursor = connection.cursor(dictionary=True)
+                    changed = self._sync(cursor)
+                    cursor.close()
+            except Error as e:
+                print(f"❌ Database error while refreshing job catalog: {e}")
+                return False
+            
+            if changed:
+                self.version += 1
+                self._index = None
+            self.loaded = True
+            return changed
+    
+    def _sync(self, cursor) -> bool:
+        """Bring the cached rows in line with the Jobs table"""
+        cursor.execute("SELECT COUNT(*) AS total, MAX(updatedAt) AS last_update FROM Jobs")
+        stats = cursor.fetchone()
+        
+        if not self.loaded or self._high_water is None:
+            cursor.execute(f"SELECT {self.JOB_COLUMNS} FROM Jobs")
+        else:
+            # Always re-read the newest tick: updatedAt has one-second precision, so a
+            # row written in the same second as the last probe leaves MAX unchanged.
+            # _upsert skips rows that did not change, which keeps this cheap.
+            cursor.execute(
+                f"SELECT {self.JOB_COLUMNS} FROM Jobs WHERE updatedAt >= %s",
+                (self._high_water,)
+            )
+        changed = self._upsert(cursor.fetchall())
+        
+        if stats['total'] != len(self._jobs):
+            cursor.execute("SELECT id FROM Jobs")
+            live_ids = {row['id'] for row in cursor.fetchall()}
+            
+            for job_id in set(self._jobs) - live_ids:
+                del self._jobs[job_id]
+                del self._parsed_skills[job_id]
+                self._details.pop(job_id, None)
+                changed = True
+            
+            missing_ids = list(live_ids - set(self._jobs))
+            if missing_ids:
+                placeholders = ", ".join(["%s"] * len(missing_ids))
+                cursor.execute(
+                    f"SELECT {self.JOB_COLUMNS} FROM Jobs WHERE id IN ({placeholders})",
+                    missing_ids
+                )
+                changed = self._upsert(cursor.fetchall()) or changed
+        
+        # Track the table's MAX(updatedAt), not the newest row ever seen: after the
+        # newest job is deleted the mark would otherwise never match the probe again
+        self._high_water = stats['last_update']
+        return changed
+    
+    def _upsert(self, rows: List[Dict]) -> bool:
+        """Store fetched rows, parsing skills only for rows whose skills changed"""
+        changed = False
+        for row in rows:
+            if row['updatedAt'] is not None and (self._high_water is None or row['updatedAt'] > self._high_water):
+                self._high_water = row['updatedAt']
+            
+            cached = self._jobs.get(row['id'])
+            if cached == row:
+                continue
+            if cached is None or cached['requiredSkills'] != row['requiredSkills']:
+                self._parsed_skills[row['id']] = self.engine.parse_job_skills(row['requiredSkills'])
+            self._jobs[row['id']] = row
+            self._details.pop(row['id'], None)
+            changed = True
+        return changed
+    
+    def get_index(self) -> JobSkillIndex:
+        """Return the skill index for the current catalog version, refreshing if due"""
+        self.refresh()
+        with self._lock:
+            if self._index is None:
+                job_ids = sorted(self._jobs)
+                self._index = JobSkillIndex(
+                    self.engine,
+                    [self._jobs[job_id] for job_id in job_ids],
+                    [self._parsed_skills[job_id] for job_id in job_ids]
+                )
+            return self._index
+    
+    def get_details(self, job_ids: List[int]) -> Dict[int, Dict]:
+        """
+        Fetch the display columns of a few jobs by primary key
+        
+        Args:
+            job_ids: Jobs to hydrate, typically the top-N of a match
+        
+        Returns:
+            Job id to DETAIL_COLUMNS row; jobs deleted meanwhile are absent
+        """
+        details = {}
+        with self._lock:
+            version = self.version
+            for job_id in job_ids:
+                row = self._details.get(job_id)
+                if row is not None:
+                    self._details.move_to_end(job_id)
+                    details[job_id] = row
+            self.detail_hits += len(details)
+        
+        missing = [job_id for job_id in dict.fromkeys(job_ids) if job_id not in details]
+        if not missing:
+            return details
+        
+        try:
+            with get_connection(**self.engine.db_config) as connection:
+                cursor = connection.cursor(dictionary=True)
+                placeholders = ", ".join(["%s"] * len(missing))
+                cursor.execute(
+                    f"SELECT {self.DETAIL_COLUMNS} FROM Jobs WHERE id IN ({placeholders})",
+                    missing
+                )
+                rows = cursor.fetchall()
+                cursor.close()
+        except Error as e:
+            print(f"❌ Database error while fetching job details: {e}")
+            return details
+        
+        with self._lock:
+            self.detail_misses += len(missing)
+            for row in rows:
+                details[row['id']] = row
+                # Rows read while a refresh changed the catalog may already be stale
+                if self.version == version:
+                    self._details[row['id']] = row
+            while len(self._details) > self.detail_cache_size:
+                self._details.popitem(last=False)
+        return details
+    
+    def clear_details(self) -> int:
+        """
+        Drop all cached display columns
+        
+        Returns:
+            Number of entries dropped
+        """
+        with self._lock:
+            dropped = len(self._details)
+            self._details.clear()
+            return dropped
+    
+    def stats(self) -> Dict:
+        """Catalog size and detail cache counters"""
+        with self._lock:
+            lookups = self.detail_hits + self.detail_misses
+            return {
+                "jobs": len(self._jobs),
+                "version": self.version,
+                "detail_cache_entries": len(self._details),
+                "detail_cache_hit_rate": round(self.detail_hits / lookups, 3) if lookups else 0
+            }
+
+
+_job_catalogs: Dict[Tuple, JobCatalog] = {}
+_job_catalogs_lock = threading.Lock()
+
+
+def get_job_catalog(engine: 'JobMatchingEngine') -> JobCatalog:
+    """Return the process-wide job catalog for the engine's database"""
+    key = (engine.db_config['host'], engine.db_config['port'], engine.db_config['database'])
+    with _job_catalogs_lock:
+        if key not in _job_catalogs:
+            _job_catalogs[key] = JobCatalog(
+                engine,
+                refresh_interval=float(os.getenv("JOB_CATALOG_REFRESH_SECONDS", "5")),
+                detail_cache_size=int(os.getenv("JOB_DETAIL_CACHE_SIZE", "1024"))
+            )
+        return _job_catalogs[key]
+
+
+class MatchResultCache:
+    """
+    LRU cache of get_json_output results.
+    
+    Each entry records the user-skills and job-catalog versions it was built
+    from and is only served while both still match and its TTL has not
+    expired. Both versions are read from the database (see
+    JobMatchingEngine.get_user_skill_versions and JobCatalog.refresh), so
+    skill and job edits made by the backend are seen without any explicit
+    invalidation, by every worker process.
+    """
+    
+    def __init__(self, max_entries: int = 4096, ttl: float = 300.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[Tuple, Tuple[Tuple, float, Dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+        
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+    
+    def get(self, key: Tuple, versions: Tuple) -> Optional[Dict]:
+        """Return the cached result for key if it was built from these versions"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            
+            entry_versions, expires_at, result = entry
+            if entry_versions != versions or time.monotonic() > expires_at:
+                del self._entries[key]
+                self.stale += 1
+                self.misses += 1
+                return None
+            
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return result
+    
+    def put(self, key: Tuple, versions: Tuple, result: Dict):
+        with self._lock:
+            self._entries[key] = (versions, time.monotonic() + self.ttl, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def invalidate_user(self, user_id: int) -> int:
+        """Drop every cached result for a user; returns the number dropped"""
+        with self._lock:
+            keys = [key for key in self._entries if key[0] == user_id]
+            for key in keys:
+                del self._entries[key]
+            return len(keys)
+    
+    def clear(self) -> int:
+        with self._lock:
+            dropped = len(self._entries)
+            self._entries.clear()
+            return dropped
+    
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "stale": self.stale,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0
+            }
 
 
 class JobMatchingEngine:
@@ -15,13 +776,7 @@ class JobMatchingEngine:
     
     def __init__(self):
         """Initialize the job matching engine"""
-        self.db_config = {
-            "host": "localhost",
-            "user": "root",
-            "password": "",
-            "database": "final_db",
-            "port": 3307
-        }
+        self.db_config = dict(DB_CONFIG)
         
         # Skill proficiency weights
         self.proficiency_weights = {
@@ -51,55 +806,73 @@ class JobMatchingEngine:
             "Remote.co": "https://remote.co/remote-jobs",
             "We Work Remotely": "https://weworkremotely.com"
         }
-    
+        
+        # Shared job catalog, refreshed incrementally
+        self.job_catalog = get_job_catalog(self)
+        self.use_vectorized_scoring = NUMPY_AVAILABLE
+        
+        # get_json_output results, valid while user-skills and catalog versions match
+        self.match_cache = MatchResultCache(
+            max_entries=int(os.getenv("MATCH_CACHE_SIZE", "4096")),
+            ttl=float(os.getenv("MATCH_CACHE_TTL_SECONDS", "300"))
+        )
+
     def get_user_skills(self, user_id: int) -> List[Dict]:
         """Fetch user skills from database"""
-        connection = None
         try:
-            connection = mysql.connector.connect(**self.db_config)
-            cursor = connection.cursor(dictionary=True)
-            
-            query = """
-                SELECT skillName, proficiency 
-                FROM UserSkills 
-                WHERE userId = %s
-            """
-            cursor.execute(query, (user_id,))
-            skills = cursor.fetchall()
-            cursor.close()
-            return skills
-            
+            with get_connection(**self.db_config) as connection:
+                cursor = connection.cursor(dictionary=True)
+                
+                query = """
+                    SELECT skillName, proficiency 
+                    FROM UserSkills 
+                    WHERE userId = %s
+                """
+                cursor.execute(query, (user_id,))
+                skills = cursor.fetchall()
+                cursor.close()
+                return skills
+        
         except Error as e:
             print(f"❌ Database error: {e}")
             return []
-        finally:
-            if connection and connection.is_connected():
-                connection.close()
     
-    def get_all_jobs(self) -> List[Dict]:
-        """Fetch all jobs from database"""
-        connection = None
+    def get_users_skills(self, user_ids: List[int], chunk_size: int = 1000) -> Dict[int, List[Dict]]:
+        """
+        Fetch skills for many users with one IN query per chunk of user IDs
+        
+        Returns:
+            User ID to skill rows (users without skills are absent)
+        """
+        skills_by_user: Dict[int, List[Dict]] = {}
+        if not user_ids:
+            return skills_by_user
+        
         try:
-            connection = mysql.connector.connect(**self.db_config)
-            cursor = connection.cursor(dictionary=True)
-            
-            query = """
-                SELECT id, title, company, location, requiredSkills, 
-                       experienceLevel, jobType, careerTrack, description
-                FROM Jobs
-            """
-            cursor.execute(query)
-            jobs = cursor.fetchall()
-            cursor.close()
-            return jobs
-            
+            with get_connection(**self.db_config) as connection:
+                cursor = connection.cursor(dictionary=True)
+                for start in range(0, len(user_ids), chunk_size):
+                    chunk = user_ids[start:start + chunk_size]
+                    placeholders = ", ".join(["%s"] * len(chunk))
+                    cursor.execute(f"""
+                        SELECT userId, skillName, proficiency 
+                        FROM UserSkills 
+                        WHERE userId IN ({placeholders})
+                        ORDER BY userId, id
+                    """, tuple(chunk))
+                    for row in cursor.fetchall():
+                        skills_by_user.setdefault(row.pop('userId'), []).append(row)
+                cursor.close()
+                return skills_by_user
+        
         except Error as e:
             print(f"❌ Database error: {e}")
-            return []
-        finally:
-            if connection and connection.is_connected():
-                connection.close()
+            return {}
     
+    def get_all_jobs(self) -> List[Dict]:
+        """Get all jobs from the shared job catalog (scoring columns only, see JobCatalog.get_details)"""
+        return self.job_catalog.get_index().jobs
+
     def parse_required_skills(self, skills_str: str) -> List[str]:
         """Parse required skills string into list"""
         if not skills_str:
@@ -112,9 +885,26 @@ class JobMatchingEngine:
     
     def normalize_skill(self, skill: str) -> str:
         """Normalize skill name for comparison"""
-        return skill.lower().strip().replace('-', '').replace('.', '')
+        return _normalize_skill(skill)
+    
+    def canonical_skill(self, skill: str) -> str:
+        """Normalize a skill name and resolve aliases and free-form text (JS -> javascript)"""
+        return _canonical_skill(skill)
+    
+    def parse_job_skills(self, skills_str: str) -> Tuple[List[str], List[str]]:
+        """Parse a requiredSkills value into (required skills, canonical skill names)"""
+        required = self.parse_required_skills(skills_str)
+        return required, [self.canonical_skill(s) for s in required]
+
+    def build_user_skill_map(self, user_skills: List[Dict]) -> Dict[str, str]:
+        """Map canonical user skill names to proficiency"""
+        return {
+            self.canonical_skill(skill['skillName']): skill['proficiency']
+            for skill in user_skills
+        }
     
-    def calculate_skill_match(self, user_skills: List[Dict], required_skills: List[str]) -> Dict:
+    def calculate_skill_match(self, user_skills: List[Dict], required_skills: List[str],
+                              user_skill_map: Optional[Dict[str, str]] = None) -> Dict:
         """
         Calculate skill match score and details
         Returns: {
@@ -125,20 +915,15 @@ class JobMatchingEngine:
         }
         """
         # Normalize user skills
-        user_skill_map = {
-            self.normalize_skill(skill['skillName']): skill['proficiency']
-            for skill in user_skills
-        }
-        
-        # Normalize required skills
-        required_normalized = [self.normalize_skill(s) for s in required_skills]
+        if user_skill_map is None:
+            user_skill_map = self.build_user_skill_map(user_skills)
         
         matched_skills = []
         missing_skills = []
         proficiency_sum = 0
         
         for req_skill in required_skills:
-            req_norm = self.normalize_skill(req_skill)
+            req_norm = self.canonical_skill(req_skill)
             
             if req_norm in user_skill_map:
                 proficiency = user_skill_map[req_norm]
@@ -287,6 +1072,185 @@ class JobMatchingEngine:
         
         return platforms
     
+    def calculate_context_match(self, user_experience: str, user_track: str,
+                                job_level: str, job_track: str) -> Tuple[float, float]:
+        """Calculate (experience_match, track_match) for a job's level and track"""
+        # Calculate experience match
+        experience_match = 0.5
+        if user_experience:
+            experience_match = self.calculate_experience_match(user_experience, job_level)
+        
+        # Calculate track match
+        track_match = 0.5
+        if user_track:
+            track_match = self.calculate_track_match(user_track, job_track)
+        
+        return experience_match, track_match
+    
+    def calculate_overall_score(self, skill_score: float, experience_match: float,
+                                track_match: float) -> float:
+        """Calculate overall match score (weighted average)"""
+        return (
+            skill_score * 0.6 +          # 60% weight on skills
+            experience_match * 0.25 +     # 25% weight on experience
+            track_match * 0.15            # 15% weight on track
+        )
+    
+    def build_match(self, job: Dict, required_skills: List[str], user_skills: List[Dict],
+                    user_skill_map: Dict[str, str], user_experience: str = None,
+                    user_track: str = None) -> Dict:
+        """Build the detailed match result for a single job"""
+        # Calculate skill match
+        skill_match = self.calculate_skill_match(user_skills, required_skills, user_skill_map)
+        
+        # Calculate experience and track match
+        experience_match, track_match = self.calculate_context_match(
+            user_experience, user_track, job['experienceLevel'], job['careerTrack']
+        )
+        
+        overall_score = self.calculate_overall_score(skill_match['score'], experience_match, track_match)
+        
+        # Get job platforms
+        platforms = self.get_job_platforms_for_job(job)
+        
+        # Build match reasons
+        reasons = []
+        
+        if skill_match['matched_skills']:
+            matched_names = [s['skill'] for s in skill_match['matched_skills']]
+            reasons.append(f"✓ Matches {len(matched_names)} skills: {', '.join(matched_names[:5])}")
+        
+        if skill_match['missing_skills']:
+            missing_names = skill_match['missing_skills']
+            reasons.append(f"✗ Missing {len(missing_names)} skills: {', '.join(missing_names[:5])}")
+        
+        if experience_match >= 0.7:
+            reasons.append(f"✓ Experience level matches ({job['experienceLevel']})")
+        elif experience_match < 0.5:
+            reasons.append(f"⚠ Experience mismatch (requires {job['experienceLevel']})")
+        
+        if track_match >= 0.7:
+            reasons.append(f"✓ Career track aligns ({job['careerTrack']})")
+        
+        return {
+            'job_id': job['id'],
+            'title': job['title'],
+            'company': job['company'],
+            'location': job['location'],
+            'job_type': job['jobType'],
+            'experience_level': job['experienceLevel'],
+            'career_track': job['careerTrack'],
+            'description': job['description'],
+            'required_skills': required_skills,
+            'match_score': overall_score,
+            'match_percentage': round(overall_score * 100, 1),
+            'skill_match': skill_match,
+            'experience_match': experience_match,
+            'track_match': track_match,
+            'reasons': reasons,
+            'platforms': platforms,
+            'recommendation': self.get_recommendation(overall_score, skill_match)
+        }
+    
+    def rank_jobs(self, index: JobSkillIndex, user_skills: List[Dict], user_skill_map: Dict[str, str],
+                  user_experience: str = None, user_track: str = None,
+                  top_n: int = 10) -> List[int]:
+        """
+        Select the exact top-N job positions, ordered by descending match score
+        
+        Uses the vectorized scoring matrix when NumPy is available and falls back
+        to skill-index candidate scoring otherwise.
+        """
+        if self.use_vectorized_scoring and index.scoring_matrix is not None:
+            scores = index.scoring_matrix.score(self, user_skill_map, user_experience, user_track)
+            return index.scoring_matrix.top_positions(scores, top_n)
+        
+        return self._rank_jobs_by_index(index, user_skills, user_skill_map,
+                                        user_experience, user_track, top_n)
+    
+    def _rank_jobs_by_index(self, index: JobSkillIndex, user_skills: List[Dict],
+                            user_skill_map: Dict[str, str], user_experience: str = None,
+                            user_track: str = None, top_n: int = 10) -> List[int]:
+        """
+        Select the exact top-N job positions without scoring every job
+        
+        Only jobs sharing a skill with the user are skill-scored, and their
+        scores stream through a bounded heap that keeps the best top_n. Every
+        other job has a skill score of 0, so its overall score depends only on
+        its (experience level, career track) group and is computed once per
+        group. Ties are broken by job order, matching a stable sort on match
+        score.
+        
+        Returns:
+            Job positions ordered by descending match score
+        """
+        top_n = max(top_n, 0)
+        user_weights = {
+            skill_id: self.proficiency_weights.get(proficiency, 0.5)
+            for skill_id, proficiency in index.vocabulary.encode_map(user_skill_map).items()
+        }
+        candidates = index.candidates(user_weights)
+        candidate_set = set(candidates)
+        
+        # (-score, position) sorts best first with the lower position winning ties
+        scored = (
+            (-self._score_position(index, position, user_weights, user_experience, user_track), position)
+            for position in candidates
+        )
+        ranked_candidates = heapq.nsmallest(top_n, scored)
+        
+        streams = [ranked_candidates]
+        for (level, track), positions in index.context_groups.items():
+            score = self.calculate_overall_score(
+                0, *self.calculate_context_match(user_experience, user_track, level, track)
+            )
+            streams.append(self._iter_group(score, positions, candidate_set))
+        
+        return [position for _, position in islice(heapq.merge(*streams), top_n)]
+    
+    def _score_position(self, index: JobSkillIndex, position: int, user_weights: Dict[int, float],
+                        user_experience: str = None, user_track: str = None) -> float:
+        """Overall match score of one indexed job"""
+        level, track = index.job_contexts[position]
+        return self.calculate_overall_score(
+            self._skill_score_ids(index.skill_ids[position], user_weights),
+            *self.calculate_context_match(user_experience, user_track, level, track)
+        )
+    
+    @staticmethod
+    def _skill_score_ids(skill_ids: array, user_weights: Dict[int, float]) -> float:
+        """
+        calculate_skill_match()['score'] over skill ids
+        
+        Args:
+            skill_ids: A job's required skill ids, in requirement order
+            user_weights: User skill id to proficiency weight
+        """
+        if not skill_ids:
+            return 0
+        
+        matched = 0
+        proficiency_sum = 0
+        for skill_id in skill_ids:
+            weight = user_weights.get(skill_id)
+            if weight is not None:
+                matched += 1
+                proficiency_sum += weight
+        
+        # Same operations in the same order as calculate_skill_match, so scores are identical
+        base_score = matched / len(skill_ids)
+        proficiency_bonus = 0
+        if matched:
+            proficiency_bonus = proficiency_sum / matched * 0.2
+        return min(base_score + proficiency_bonus, 1.0)
+    
+    @staticmethod
+    def _iter_group(score: float, positions: List[int], exclude: set):
+        """Yield (-score, position) for the jobs of one context group not already scored"""
+        for position in positions:
+            if position not in exclude:
+                yield -score, position
+    
     def match_user_to_jobs(self, user_id: int, user_experience: str = None, 
                           user_track: str = None, top_n: int = 10) -> List[Dict]:
         """
@@ -307,91 +1271,51 @@ class JobMatchingEngine:
         if not user_skills:
             return []
         
-        # Get all jobs
-        jobs = self.get_all_jobs()
+        # Get the indexed job catalog
+        index = self.job_catalog.get_index()
+        jobs = index.jobs
         
         if not jobs:
             return []
         
-        matches = []
+        user_skill_map = self.build_user_skill_map(user_skills)
         
-        for job in jobs:
-            # Parse required skills
-            required_skills = self.parse_required_skills(job['requiredSkills'])
-            
-            # Calculate skill match
-            skill_match = self.calculate_skill_match(user_skills, required_skills)
-            
-            # Calculate experience match
-            experience_match = 0.5
-            if user_experience:
-                experience_match = self.calculate_experience_match(
-                    user_experience, 
-                    job['experienceLevel']
-                )
-            
-            # Calculate track match
-            track_match = 0.5
-            if user_track:
-                track_match = self.calculate_track_match(
-                    user_track, 
-                    job['careerTrack']
-                )
-            
-            # Calculate overall match score (weighted average)
-            overall_score = (
-                skill_match['score'] * 0.6 +      # 60% weight on skills
-                experience_match * 0.25 +          # 25% weight on experience
-                track_match * 0.15                 # 15% weight on track
-            )
-            
-            # Get job platforms
-            platforms = self.get_job_platforms_for_job(job)
-            
-            # Build match reasons
-            reasons = []
-            
-            if skill_match['matched_skills']:
-                matched_names = [s['skill'] for s in skill_match['matched_skills']]
-                reasons.append(f"✓ Matches {len(matched_names)} skills: {', '.join(matched_names[:5])}")
-            
-            if skill_match['missing_skills']:
-                missing_names = skill_match['missing_skills']
-                reasons.append(f"✗ Missing {len(missing_names)} skills: {', '.join(missing_names[:5])}")
-            
-            if experience_match >= 0.7:
-                reasons.append(f"✓ Experience level matches ({job['experienceLevel']})")
-            elif experience_match < 0.5:
-                reasons.append(f"⚠ Experience mismatch (requires {job['experienceLevel']})")
-            
-            if track_match >= 0.7:
-                reasons.append(f"✓ Career track aligns ({job['careerTrack']})")
-            
-            matches.append({
-                'job_id': job['id'],
-                'title': job['title'],
-                'company': job['company'],
-                'location': job['location'],
-                'job_type': job['jobType'],
-                'experience_level': job['experienceLevel'],
-                'career_track': job['careerTrack'],
-                'description': job['description'],
-                'required_skills': required_skills,
-                'match_score': overall_score,
-                'match_percentage': round(overall_score * 100, 1),
-                'skill_match': skill_match,
-                'experience_match': experience_match,
-                'track_match': track_match,
-                'reasons': reasons,
-                'platforms': platforms,
-                'recommendation': self.get_recommendation(overall_score, skill_match)
-            })
+        if top_n is None:
+            top_n = len(jobs)
         
-        # Sort by match score
-        matches.sort(key=lambda x: x['match_score'], reverse=True)
+        winners = self.rank_jobs(index, user_skills, user_skill_map,
+                                 user_experience, user_track, top_n)
         
-        return matches[:top_n]
+        # Hydrate and build detailed results only for the winning jobs
+        details = self.job_catalog.get_details([jobs[position]['id'] for position in winners])
+        return self.build_matches(index, winners, details, user_skills, user_skill_map,
+                                  user_experience, user_track)
     
+    def build_matches(self, index: JobSkillIndex, positions: List[int], details: Dict[int, Dict],
+                      user_skills: List[Dict], user_skill_map: Dict[str, str],
+                      user_experience: str = None, user_track: str = None) -> List[Dict]:
+        """
+        Build detailed results for ranked job positions
+        
+        Args:
+            index: Index the positions refer to
+            positions: Ranked job positions
+            details: Display columns by job id, from JobCatalog.get_details()
+        
+        Returns:
+            Matches in rank order; jobs without details (deleted since scoring) are skipped
+        """
+        matches = []
+        for position in positions:
+            job = index.jobs[position]
+            detail = details.get(job['id'])
+            if detail is None:
+                continue
+            matches.append(self.build_match({**job, **detail}, index.required_skills[position],
+                                            user_skills, user_skill_map, user_experience, user_track))
+        return matches
+    
+
     def get_recommendation(self, match_score: float, skill_match: Dict) -> str:
         """Generate recommendation based on match score"""
         if match_score >= 0.8:
@@ -463,11 +1387,180 @@ class JobMatchingEngine:
             'recommendation': f"Focus on learning: {', '.join([s for s, _ in top_skills[:5]])}"
         }
     
+    def match_users_to_jobs(self, user_ids: List[int], user_experience: str = None,
+                            user_track: str = None, top_n: int = 10,
+                            batch_size: int = 64) -> Iterator[Tuple[int, List[Dict]]]:
+        """
+        Match many users to jobs, loading skills and the job catalog once
+        
+        Users are scored in batches as a users x jobs matrix when NumPy is
+        available, otherwise one by one against the skill index.
+        
+        Args:
+            user_ids: User IDs (duplicates are matched once)
+            user_experience: Experience level applied to every user (optional)
+            user_track: Career track applied to every user (optional)
+            top_n: Number of top matches per user
+            batch_size: Users scored per matrix product (bounds memory)
+        
+        Yields:
+            (user_id, matches) in input order; matches as from match_user_to_jobs
+        """
+        user_ids = list(dict.fromkeys(user_ids))
+        skills_by_user = self.get_users_skills(user_ids)
+        index = self.job_catalog.get_index()
+        jobs = index.jobs
+        if top_n is None:
+            top_n = len(jobs)
+        
+        for start in range(0, len(user_ids), batch_size):
+            batch = user_ids[start:start + batch_size]
+            scored = [user_id for user_id in batch if skills_by_user.get(user_id) and jobs]
+            skill_maps = {user_id: self.build_user_skill_map(skills_by_user[user_id]) for user_id in scored}
+            
+            winners: Dict[int, List[int]] = {}
+            if scored and self.use_vectorized_scoring and index.scoring_matrix is not None:
+                scores = index.scoring_matrix.score_many(
+                    self, [skill_maps[user_id] for user_id in scored], user_experience, user_track
+                )
+                for user_id, row in zip(scored, scores):
+                    winners[user_id] = index.scoring_matrix.top_positions(row, top_n)
+            else:
+                for user_id in scored:
+                    winners[user_id] = self._rank_jobs_by_index(
+                        index, skills_by_user[user_id], skill_maps[user_id],
+                        user_experience, user_track, top_n
+                    )
+            
+            # One primary key lookup hydrates every winner of the batch
+            details = self.job_catalog.get_details(
+                [jobs[position]['id'] for positions in winners.values() for position in positions]
+            )
+            for user_id in batch:
+                if user_id not in winners:
+                    yield user_id, []
+                    continue
+                yield user_id, self.build_matches(index, winners[user_id], details,
+                                                  skills_by_user[user_id], skill_maps[user_id],
+                                                  user_experience, user_track)
+    
+    def iter_json_outputs(self, user_ids: List[int], user_experience: str = None,
+                          user_track: str = None, top_n: int = 10) -> Iterator[Dict]:
+        """
+        Batch form of get_json_output: yield one result dict per user
+        
+        Successful results also populate the match cache.
+        """
+        self.job_catalog.refresh()
+        catalog_version = self.job_catalog.version
+        skill_versions = self.get_user_skill_versions(user_ids)
+        
+        for user_id, matches in self.match_users_to_jobs(user_ids, user_experience, user_track, top_n):
+            result = self.format_json_output(user_id, user_experience, user_track, matches)
+            if result["success"] and skill_versions is not None:
+                self.match_cache.put(
+                    (user_id, user_experience, user_track, top_n),
+                    (skill_versions[user_id], catalog_version),
+                    result
+                )
+            yield result
+    
+    def get_user_skill_versions(self, user_ids: List[int],
+                                chunk_size: int = 1000) -> Optional[Dict[int, Tuple]]:
+        """
+        Version of each user's skills, derived from the UserSkills rows
+        
+        (COUNT(*), MAX(id), MAX(updatedAt)) changes whenever a skill is added
+        (new auto-increment id), deleted (count) or edited (updatedAt).
+        
+        Returns:
+            User ID to version tuple, or None if the database could not be read
+        """
+        versions = {user_id: (0, None, None) for user_id in user_ids}
+        if not user_ids:
+            return versions
+        
+        try:
+            with get_connection(**self.db_config) as connection:
+                cursor = connection.cursor(dictionary=True)
+                for start in range(0, len(user_ids), chunk_size):
+                    chunk = user_ids[start:start + chunk_size]
+                    placeholders = ", ".join(["%s"] * len(chunk))
+                    cursor.execute(f"""
+                        SELECT userId, COUNT(*) AS total, MAX(id) AS last_id, MAX(updatedAt) AS last_update
+                        FROM UserSkills 
+                        WHERE userId IN ({placeholders})
+                        GROUP BY userId
+                    """, tuple(chunk))
+                    for row in cursor.fetchall():
+                        versions[row['userId']] = (row['total'], row['last_id'], row['last_update'])
+                cursor.close()
+                return versions
+        
+        except Error as e:
+            print(f"❌ Database error: {e}")
+            return None
+    
+    def invalidate_user(self, user_id: int) -> int:
+        """
+        Drop a user's cached match results right away
+        
+        Not needed for correctness (skill versions are read from the database);
+        it frees the entries early.
+        
+        Returns:
+            Number of cached results dropped
+        """
+        return self.match_cache.invalidate_user(user_id)
+    
+    def invalidate_jobs(self) -> bool:
+        """
+        Pick up job changes now instead of at the next scheduled catalog refresh
+        
+        Also flushes cached job details, so edits to display columns that did
+        not bump updatedAt show up in the next results.
+        
+        Returns:
+            True if the catalog changed (its new version invalidates cached results)
+        """
+        self.job_catalog.clear_details()
+        return self.job_catalog.refresh(force=True)
+    
     def get_json_output(self, user_id: int, user_experience: str = None, 
                        user_track: str = None, top_n: int = 10) -> Dict:
         """
         Get complete job matching results as JSON-ready dictionary
         
+        Served from the match cache while the user's skills and the job catalog
+        are unchanged. The returned dict may be shared - do not modify it.
+        
+        Returns:
+            Dictionary with all matching results in JSON format
+        """
+        # Throttled probe, so the catalog version reflects recent job edits
+        self.job_catalog.refresh()
+        
+        # Versions are read before computing: a skill edit that lands while
+        # the result is being built leaves it stale rather than cached as fresh
+        skill_versions = self.get_user_skill_versions([user_id])
+        if skill_versions is None:
+            return self.build_json_output(user_id, user_experience, user_track, top_n)
+        
+        key = (user_id, user_experience, user_track, top_n)
+        versions = (skill_versions[user_id], self.job_catalog.version)
+        result = self.match_cache.get(key, versions)
+        if result is None:
+            result = self.build_json_output(user_id, user_experience, user_track, top_n)
+            # Failures (no skills yet, database errors) are retried on the next call
+            if result["success"]:
+                self.match_cache.put(key, versions, result)
+        return result
+    
+    def build_json_output(self, user_id: int, user_experience: str = None,
+                          user_track: str = None, top_n: int = 10) -> Dict:
+        """
+        Build job matching results as a JSON-ready dictionary (uncached)
+        
         Returns:
             Dictionary with all matching results in JSON format
         """
@@ -477,7 +1570,11 @@ class JobMatchingEngine:
             user_track=user_track,
             top_n=top_n
         )
-        
+        return self.format_json_output(user_id, user_experience, user_track, matches)
+    
+    def format_json_output(self, user_id: int, user_experience: Optional[str],
+                           user_track: Optional[str], matches: List[Dict]) -> Dict:
+        """Shape match results into the JSON-ready response dictionary"""
         if not matches:
             return {
                 "success": False,
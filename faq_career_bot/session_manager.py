@@ -0,0 +1,181 @@
+"""
+Bounded registry of per-user CareerBotRAG sessions
+
+Replaces an ever-growing dict of bots. Sessions are evicted least recently
+used first once the registry exceeds its entry or memory budget, and any
+session idle for longer than the TTL is dropped. Evicted bots are closed so
+their conversation history leaves the shared checkpointer too; a bot that is
+still streaming an answer finishes it first and is cleaned up afterwards.
+
+Settings (environment variables):
+    BOT_SESSION_MAX_ENTRIES       - max live sessions (default 500)
+    BOT_SESSION_IDLE_TTL_SECONDS  - evict sessions idle this long (default 1800)
+    BOT_SESSION_MAX_MEMORY_MB     - cap on estimated session memory (default 256)
+"""
+
+import os
+import time
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+
+class _Session:
+    __slots__ = ("bot", "last_used", "size")
+
+    def __init__(self, bot, size: int):
+        self.bot = bot
+        self.last_used = time.monotonic()
+        self.size = size
+
+
+class BotSessionManager:
+    """LRU/TTL session registry with hit, miss and eviction counters"""
+
+    def __init__(self, max_entries: int = 500, idle_ttl: float = 1800.0,
+                 max_memory_bytes: int = 256 * 1024 * 1024):
+        """
+        Initialize an empty registry
+
+        Args:
+            max_entries: Maximum number of live sessions
+            idle_ttl: Seconds of inactivity after which a session is evicted
+            max_memory_bytes: Cap on the summed estimated size of all sessions
+        """
+        self.max_entries = max_entries
+        self.idle_ttl = idle_ttl
+        self.max_memory_bytes = max_memory_bytes
+
+        self._sessions: "OrderedDict[str, _Session]" = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = {"lru": 0, "idle": 0, "memory": 0}
+
+    @classmethod
+    def from_env(cls) -> 'BotSessionManager':
+        """Create a manager configured from environment variables"""
+        return cls(
+            max_entries=int(os.getenv("BOT_SESSION_MAX_ENTRIES", "500")),
+            idle_ttl=float(os.getenv("BOT_SESSION_IDLE_TTL_SECONDS", "1800")),
+            max_memory_bytes=int(float(os.getenv("BOT_SESSION_MAX_MEMORY_MB", "256")) * 1024 * 1024)
+        )
+
+    @staticmethod
+    def _estimate(bot) -> int:
+        """Estimated memory held by a bot session"""
+        estimate = getattr(bot, "estimate_memory_bytes", None)
+        return estimate() if estimate else 0
+
+    @staticmethod
+    def _close(bot):
+        """Release a bot's per-session state (e.g. its checkpointed conversation)"""
+        close = getattr(bot, "close", None)
+        if close:
+            close()
+
+    def get(self, key: str):
+        """
+        Return the live bot for key and mark it most recently used
+
+        Returns:
+            The bot, or None if there is no live session
+        """
+        with self._lock:
+            self._evict_idle()
+            session = self._sessions.get(key)
+            if session is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self._sessions.move_to_end(key)
+            session.last_used = time.monotonic()
+
+            # Conversation history grows between requests, so refresh the estimate
+            size = self._estimate(session.bot)
+            self._memory_bytes += size - session.size
+            session.size = size
+            self._evict_over_budget(keep=key)
+            return session.bot
+
+    def put(self, key: str, bot):
+        """
+        Register a newly created bot
+
+        Returns:
+            The registered bot (an existing one if another request registered it first)
+        """
+        with self._lock:
+            existing = self._sessions.get(key)
+            if existing is not None:
+                self._sessions.move_to_end(key)
+                existing.last_used = time.monotonic()
+                return existing.bot
+
+            session = _Session(bot, self._estimate(bot))
+            self._sessions[key] = session
+            self._memory_bytes += session.size
+            self._evict_idle()
+            self._evict_over_budget(keep=key)
+            return bot
+
+    def remove(self, key: str) -> bool:
+        """Drop a session explicitly"""
+        with self._lock:
+            session = self._sessions.pop(key, None)
+            if session is None:
+                return False
+            self._memory_bytes -= session.size
+            self._close(session.bot)
+            return True
+
+    def _evict_idle(self):
+        """Drop sessions idle for longer than the TTL (oldest first)"""
+        cutoff = time.monotonic() - self.idle_ttl
+        while self._sessions:
+            key, session = next(iter(self._sessions.items()))
+            if session.last_used > cutoff:
+                break
+            self._drop(key, "idle")
+
+    def _evict_over_budget(self, keep: Optional[str] = None):
+        """Drop least recently used sessions until entry and memory limits hold"""
+        while len(self._sessions) > self.max_entries:
+            self._drop(next(iter(self._sessions)), "lru")
+
+        while self._memory_bytes > self.max_memory_bytes and len(self._sessions) > 1:
+            key = next(iter(self._sessions))
+            if key == keep:
+                break
+            self._drop(key, "memory")
+
+    def _drop(self, key: str, reason: str):
+        session = self._sessions.pop(key)
+        self._memory_bytes -= session.size
+        self.evictions[reason] += 1
+        self._close(session.bot)
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._sessions
+
+    def stats(self) -> Dict:
+        """Registry size, limits and hit/miss/eviction counters"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "sessions": len(self._sessions),
+                "max_entries": self.max_entries,
+                "idle_ttl_seconds": self.idle_ttl,
+                "estimated_memory_bytes": self._memory_bytes,
+                "max_memory_bytes": self.max_memory_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0,
+                "evictions": dict(self.evictions)
+            }
@@ -1,14 +1,18 @@
 from fastapi import FastAPI, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import StreamingResponse
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional, Dict, List, Any
 import json
-import asyncio
-import re
 import os
-from career_bot_enhanced import CareerBotRAG
+from career_bot_enhanced import CareerBotRAG, knowledge_index_stats, token_usage_stats
 from job_matching import JobMatchingEngine
+from db import pool_stats
+from session_manager import BotSessionManager
+from guardrails import ContentGuardrails, StreamingOutputFilter
+from sse import sse_stream
+from concurrency import iterate_in_thread, stream_executor, match_executor, batch_match_executor, ExecutorBusy
 
 # Import LangSmith for API tracing
 try:
@@ -44,125 +48,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Store bot instances
-bots = {}
+# Store bot instances (bounded: LRU, idle TTL and memory caps)
+bot_sessions = BotSessionManager.from_env()
 job_engine = JobMatchingEngine()
 
-# Input/Output Guardrails
-class ContentGuardrails:
-    """Content safety guardrails for LLM inputs and outputs"""
-    
-    # Inappropriate content patterns
-    BLOCKED_PATTERNS = [
-        r'\b(hack|exploit|bypass|jailbreak)\b.*\b(system|security|filter)\b',
-        r'\b(ignore|disregard|forget)\b.*\b(instructions|rules|guidelines)\b',
-        r'\bpretend\s+to\s+be\b',
-        r'\bact\s+as\s+if\b.*\b(no\s+restrictions|unrestricted)\b',
-        r'\b(violent|harmful|illegal|unethical)\s+(content|instructions|advice)\b',
-    ]
-    
-    # Off-topic patterns (non-career related)
-    OFF_TOPIC_PATTERNS = [
-        r'\b(make|build|create|plan|organize)\b.*\b(tour|trip|vacation|holiday|travel)\b(?!.*\b(career|job|industry)\b)',
-        r'\b(make|build|create|how to)\b.*\b(pencil|pen|desk|chair|table|furniture)\b',
-        r'\b(recipe|cook|bake|food|meal|dish)\b(?!.*\b(career|job|chef|culinary)\b)',
-        r'\b(game|movie|music|song|dance|entertainment)\b(?!.*\b(career|job|industry|professional)\b)',
-        r'\b(sports|football|cricket|basketball|athletics)\b(?!.*\b(career|job|coaching|professional)\b)',
-        r'\b(weather|temperature|climate|forecast)\b(?!.*\b(career|job|meteorology)\b)',
-        r'\b(joke|funny|comedy|humor|meme)\b(?!.*\b(career|workplace|professional)\b)',
-        r'\b(shopping|buying|purchase)\b.*\b(clothes|shoes|gadgets)\b(?!.*\b(career|job|retail)\b)',
-        r'\b(medical|health|disease|treatment)\b.*\b(advice|symptoms|cure)\b(?!.*\b(career|healthcare|medical career)\b)',
-        r'\b(relationship|dating|love|marriage)\b(?!.*\b(career|workplace|professional)\b)',
-    ]
-    
-    # Career-focused keywords (allow list)
-    ALLOWED_TOPICS = [
-        'career', 'job', 'skill', 'resume', 'cv', 'interview', 'education',
-        'course', 'learning', 'training', 'salary', 'work', 'experience',
-        'professional', 'development', 'growth', 'opportunity', 'role',
-        'position', 'company', 'industry', 'qualification', 'certification',
-        'internship', 'employment', 'workplace', 'recruiter', 'hiring'
-    ]
-    
-    @staticmethod
-    def validate_input(query: str) -> tuple[bool, str]:
-        """Validate user input query
-        Returns: (is_valid, error_message)
-        """
-        if not query or not query.strip():
-            return False, "Query cannot be empty"
-        
-        if len(query) > 2000:
-            return False, "Query too long. Please keep it under 2000 characters"
-        
-        query_lower = query.lower()
-        
-        # Check for blocked patterns
-        for pattern in ContentGuardrails.BLOCKED_PATTERNS:
-            if re.search(pattern, query_lower, re.IGNORECASE):
-                return False, "Your query contains inappropriate content. Please ask career-related questions only"
-        
-        # Check for off-topic patterns
-        for pattern in ContentGuardrails.OFF_TOPIC_PATTERNS:
-            if re.search(pattern, query_lower, re.IGNORECASE):
-                return False, "I'm a career guidance AI assistant. Please ask questions related to your career, job search, skills, education, or professional development."
-        
-        # Check for excessive special characters (potential injection)
-        special_char_ratio = sum(1 for c in query if not c.isalnum() and not c.isspace()) / len(query)
-        if special_char_ratio > 0.3:
-            return False, "Query contains too many special characters"
-        
-        # Enforce career-related topics for longer queries
-        has_career_topic = any(topic in query_lower for topic in ContentGuardrails.ALLOWED_TOPICS)
-        if not has_career_topic and len(query) > 30:
-            return False, "I specialize in career guidance and professional development. Please ask questions about jobs, skills, education, interviews, resume building, or career planning."
-        
-        return True, ""
-    
-    @staticmethod
-    def sanitize_output(content: str) -> str:
-        """Sanitize LLM output before sending to user"""
-        if not content:
-            return content
-        
-        # Remove potential prompt injection attempts in output
-        sanitized = content
-        
-        # Remove system-level instructions that might have leaked
-        system_patterns = [
-            r'\[SYSTEM\].*?\[\/SYSTEM\]',
-            r'<\|im_start\|>.*?<\|im_end\|>',
-            r'###\s*Instruction:.*?###',
-        ]
-        for pattern in system_patterns:
-            sanitized = re.sub(pattern, '', sanitized, flags=re.IGNORECASE | re.DOTALL)
-        
-        # Ensure output stays professional
-        if len(sanitized) > 5000:
-            sanitized = sanitized[:5000] + "\n\n[Response truncated for length]"
-        
-        return sanitized.strip()
-    
-    @staticmethod
-    def check_output_safety(content: str) -> bool:
-        """Check if output is safe to send"""
-        if not content:
-            return True
-        
-        content_lower = content.lower()
-        
-        # Block outputs with harmful instructions
-        harmful_patterns = [
-            r'\b(how\s+to|instructions\s+for)\s+(hack|exploit|steal|harm)\b',
-            r'\b(illegal|unethical)\s+(activity|action|method)\b',
-        ]
-        
-        for pattern in harmful_patterns:
-            if re.search(pattern, content_lower):
-                return False
-        
-        return True
-
 class ChatRequest(BaseModel):
     query: str
     user_id: Optional[int] = None
@@ -174,10 +63,73 @@ class JobMatchRequest(BaseModel):
     user_track: Optional[str] = None
     top_n: Optional[int] = 10
 
+# Larger batches are rejected with 422; split them client-side
+MAX_BATCH_USERS = int(os.getenv("JOB_MATCH_BATCH_MAX_USERS", "500"))
+
+class BatchJobMatchRequest(BaseModel):
+    user_ids: List[int] = Field(max_length=MAX_BATCH_USERS)
+    user_experience: Optional[str] = None
+    user_track: Optional[str] = None
+    top_n: Optional[int] = 10
+
+class MatchCacheInvalidation(BaseModel):
+    user_ids: List[int] = []
+    jobs: bool = False
+
 @app.get("/")
 def root():
     return {"status": "online", "message": "AI Career Bot API"}
 
+@app.get("/metrics")
+def metrics():
+    """Runtime metrics for capacity monitoring"""
+    return {
+        "db_pool": pool_stats(),
+        "bot_sessions": bot_sessions.stats(),
+        "knowledge_index": knowledge_index_stats(),
+        "chat_stream_pool": stream_executor.stats(),
+        "job_match_pool": match_executor.stats(),
+        "job_match_batch_pool": batch_match_executor.stats(),
+        "match_cache": job_engine.match_cache.stats(),
+        "job_catalog": job_engine.job_catalog.stats(),
+        "llm_tokens": token_usage_stats()
+    }
+
+async def chat_events(bot: CareerBotRAG, query: str):
+    """Answer a query as a stream of SSE payloads, with output guardrails applied"""
+    try:
+        output_filter = StreamingOutputFilter()
+        # Blocking LangGraph stream runs on a worker thread, not the event loop
+        async for event in iterate_in_thread(bot.ask_stream_events(query)):
+            if event["type"] in ("tool_start", "tool_end"):
+                # Tool progress lets the client show what the assistant is doing
+                status = "started" if event["type"] == "tool_start" else "finished"
+                yield {'tool': event['tool'], 'status': status}
+                continue
+            
+            chunk = event["content"]
+            if chunk:
+                # OUTPUT GUARDRAIL: Sanitize and safety-check only the new text
+                sanitized_chunk = output_filter.feed(chunk)
+                if not output_filter.safe:
+                    yield {'error': 'Response contained inappropriate content. Please rephrase your question.'}
+                    return
+                
+                if sanitized_chunk:
+                    yield {'content': sanitized_chunk}
+        
+        # Final safety check on any held-back text
+        remaining = output_filter.finish()
+        if not output_filter.safe:
+            yield {'error': 'Response validation failed. Please try a different question.'}
+            return
+        if remaining:
+            yield {'content': remaining}
+        
+        yield {'done': True}
+    except Exception as e:
+        yield {'error': str(e)}
+
 @app.post("/chat")
 @traceable(name="api_chat_stream") if LANGSMITH_AVAILABLE else lambda x: x
 async def chat_stream(request: ChatRequest):
@@ -190,44 +142,17 @@ async def chat_stream(request: ChatRequest):
         
         # Get or create bot with user profile
         key = f"user_{request.user_id}" if request.user_id else "guest"
-        if key not in bots:
-            bots[key] = CareerBotRAG(user_id=request.user_id, user_profile=request.user_profile)
+        bot = bot_sessions.get(key)
+        if bot is None:
+            bot = bot_sessions.put(key, await run_in_threadpool(
+                CareerBotRAG, user_id=request.user_id, user_profile=request.user_profile
+            ))
         else:
             # Update bot with latest user profile data
-            bots[key].update_user_profile(request.user_profile)
-        
-        bot = bots[key]
-        
-        async def generate():
-            try:
-                accumulated_output = ""
-                for chunk in bot.ask_stream(request.query):
-                    if chunk:
-                        # OUTPUT GUARDRAIL: Sanitize each chunk
-                        sanitized_chunk = ContentGuardrails.sanitize_output(chunk)
-                        accumulated_output += sanitized_chunk
-                        
-                        # Check accumulated output safety periodically
-                        if len(accumulated_output) % 500 < len(sanitized_chunk):
-                            if not ContentGuardrails.check_output_safety(accumulated_output):
-                                yield f"data: {json.dumps({'error': 'Response contained inappropriate content. Please rephrase your question.'})}\n\n"
-                                return
-                        
-                        if sanitized_chunk:
-                            yield f"data: {json.dumps({'content': sanitized_chunk})}\n\n"
-                            await asyncio.sleep(0)
-                
-                # Final safety check
-                if not ContentGuardrails.check_output_safety(accumulated_output):
-                    yield f"data: {json.dumps({'error': 'Response validation failed. Please try a different question.'})}\n\n"
-                    return
-                
-                yield f"data: {json.dumps({'done': True})}\n\n"
-            except Exception as e:
-                yield f"data: {json.dumps({'error': str(e)})}\n\n"
+            bot.update_user_profile(request.user_profile)
         
         return StreamingResponse(
-            generate(),
+            sse_stream(chat_events(bot, request.query)),
             media_type="text/event-stream"
         )
     except HTTPException:
@@ -235,32 +160,84 @@ async def chat_stream(request: ChatRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+async def run_job_match(user_id: int, experience: Optional[str], track: Optional[str], top_n: Optional[int]) -> Dict:
+    """Compute matches on the dedicated matching pool; identical in-flight requests share one run"""
+    try:
+        return await match_executor.run(
+            (user_id, experience, track, top_n),
+            job_engine.get_json_output,
+            user_id=user_id,
+            user_experience=experience,
+            user_track=track,
+            top_n=top_n
+        )
+    except ExecutorBusy as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+
 @app.post("/match-jobs")
 @traceable(name="api_match_jobs") if LANGSMITH_AVAILABLE else lambda x: x
-def match_jobs(request: JobMatchRequest):
+async def match_jobs(request: JobMatchRequest):
     """Find matching jobs for user with detailed scoring and JSON output"""
     try:
-        result = job_engine.get_json_output(
-            user_id=request.user_id,
-            user_experience=request.user_experience,
-            user_track=request.user_track,
-            top_n=request.top_n
+        result = await run_job_match(
+            request.user_id,
+            request.user_experience,
+            request.user_track,
+            request.top_n
         )
         return result
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/job-match/{user_id}")
-def get_job_match(user_id: int, experience: str = None, track: str = None, top_n: int = 10):
+async def get_job_match(user_id: int, experience: str = None, track: str = None, top_n: int = 10):
     """GET endpoint for job matching with JSON output"""
     try:
-        result = job_engine.get_json_output(
-            user_id=user_id,
-            user_experience=experience,
-            user_track=track,
-            top_n=top_n
-        )
+        result = await run_job_match(user_id, experience, track, top_n)
         return result
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/match-jobs/batch")
+async def match_jobs_batch(request: BatchJobMatchRequest):
+    """Match many users in one call; streams one get_json_output-shaped result per line (NDJSON)"""
+    results = job_engine.iter_json_outputs(
+        request.user_ids,
+        user_experience=request.user_experience,
+        user_track=request.user_track,
+        top_n=request.top_n
+    )
+    try:
+        # Skills load and scoring run on the batch pool, not the event loop
+        stream = batch_match_executor.stream(results)
+    except ExecutorBusy as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    
+    async def generate():
+        try:
+            async for result in stream:
+                yield json.dumps(result, default=str) + "\n"
+        except Exception as e:
+            yield json.dumps({"success": False, "error": str(e)}) + "\n"
+    
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+@app.post("/match-cache/invalidate")
+def invalidate_match_cache(request: MatchCacheInvalidation):
+    """Optional hint after UserSkills or Jobs change: frees cached matches early and applies job edits now (this worker only)"""
+    try:
+        dropped = sum(job_engine.invalidate_user(user_id) for user_id in request.user_ids)
+        jobs_changed = job_engine.invalidate_jobs() if request.jobs else False
+        return {
+            "success": True,
+            "users_invalidated": len(request.user_ids),
+            "entries_dropped": dropped,
+            "jobs_changed": jobs_changed
+        }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -279,7 +256,8 @@ async def chat_with_jobs(request: ChatRequest):
         # Get job matches if user_id provided
         job_context = ""
         if request.user_id:
-            matches = job_engine.match_user_to_jobs(
+            matches = await run_in_threadpool(
+                job_engine.match_user_to_jobs,
                 user_id=request.user_id,
                 top_n=5
             )
@@ -306,43 +284,16 @@ async def chat_with_jobs(request: ChatRequest):
         
         # Get or create bot with user profile
         key = f"user_{request.user_id}" if request.user_id else "guest"
-        if key not in bots:
-            bots[key] = CareerBotRAG(user_id=request.user_id, user_profile=request.user_profile)
+        bot = bot_sessions.get(key)
+        if bot is None:
+            bot = bot_sessions.put(key, await run_in_threadpool(
+                CareerBotRAG, user_id=request.user_id, user_profile=request.user_profile
+            ))
         else:
-            bots[key].update_user_profile(request.user_profile)
-        
-        bot = bots[key]
-        
-        async def generate():
-            try:
-                accumulated_output = ""
-                for chunk in bot.ask_stream(enhanced_query):
-                    if chunk:
-                        # OUTPUT GUARDRAIL: Sanitize each chunk
-                        sanitized_chunk = ContentGuardrails.sanitize_output(chunk)
-                        accumulated_output += sanitized_chunk
-                        
-                        # Check accumulated output safety periodically
-                        if len(accumulated_output) % 500 < len(sanitized_chunk):
-                            if not ContentGuardrails.check_output_safety(accumulated_output):
-                                yield f"data: {json.dumps({'error': 'Response contained inappropriate content. Please rephrase your question.'})}\n\n"
-                                return
-                        
-                        if sanitized_chunk:
-                            yield f"data: {json.dumps({'content': sanitized_chunk})}\n\n"
-                            await asyncio.sleep(0)
-                
-                # Final safety check
-                if not ContentGuardrails.check_output_safety(accumulated_output):
-                    yield f"data: {json.dumps({'error': 'Response validation failed. Please try a different question.'})}\n\n"
-                    return
-                
-                yield f"data: {json.dumps({'done': True})}\n\n"
-            except Exception as e:
-                yield f"data: {json.dumps({'error': str(e)})}\n\n"
+            bot.update_user_profile(request.user_profile)
         
         return StreamingResponse(
-            generate(),
+            sse_stream(chat_events(bot, enhanced_query)),
             media_type="text/event-stream"
         )
     except HTTPException:
@@ -0,0 +1,112 @@
+"""
+Server-sent event framing for the chat endpoints
+
+Chat handlers produce payload dicts ({"content": ...}, {"tool": ...},
+{"error": ...}, {"done": True}); sse_stream turns them into "data:" frames.
+Consecutive content deltas are coalesced into one frame, flushed once the
+oldest buffered delta is SSE_FLUSH_MS old or the buffer reaches
+SSE_FLUSH_BYTES, so a long answer costs a handful of writes instead of one per
+token. Any other payload flushes the buffer first, keeping event order.
+JSON encoding uses orjson when it is installed.
+
+Settings (environment variables):
+    SSE_FLUSH_MS     - max time a content delta waits in the buffer (default 20, 0 disables coalescing)
+    SSE_FLUSH_BYTES  - flush once this many characters are buffered (default 1024)
+"""
+
+import os
+import json
+import asyncio
+from typing import AsyncIterator, Dict, List
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+FLUSH_INTERVAL = float(os.getenv("SSE_FLUSH_MS", "20")) / 1000
+FLUSH_BYTES = int(os.getenv("SSE_FLUSH_BYTES", "1024"))
+
+_END = object()
+
+
+def dumps(payload: Dict) -> str:
+    """Encode a payload as JSON (orjson when available)"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(payload).decode("utf-8")
+    return json.dumps(payload)
+
+
+def sse_event(payload: Dict) -> str:
+    """Frame a payload as one server-sent event"""
+    return f"data: {dumps(payload)}\n\n"
+
+
+async def sse_stream(payloads: AsyncIterator[Dict], flush_interval: float = FLUSH_INTERVAL,
+                     flush_bytes: int = FLUSH_BYTES) -> AsyncIterator[str]:
+    """
+    Frame payloads as server-sent events, coalescing content deltas
+
+    Args:
+        payloads: Async iterator of payload dicts
+        flush_interval: Seconds a content delta may wait before being sent
+        flush_bytes: Buffered characters that trigger an immediate flush
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=256)
+
+    async def pump():
+        try:
+            async for payload in payloads:
+                await queue.put(payload)
+        except Exception as e:
+            await queue.put({"error": str(e)})
+        await queue.put(_END)
+
+    # The producer runs as its own task so a flush deadline can fire while it waits
+    producer = asyncio.create_task(pump())
+    buffer: List[str] = []
+    buffered = 0
+    deadline = None
+
+    def flush() -> str:
+        nonlocal buffered, deadline
+        frame = sse_event({"content": "".join(buffer)})
+        buffer.clear()
+        buffered = 0
+        deadline = None
+        return frame
+
+    try:
+        while True:
+            try:
+                if deadline is None:
+                    payload = await queue.get()
+                else:
+                    payload = await asyncio.wait_for(queue.get(), max(0.0, deadline - loop.time()))
+            except asyncio.TimeoutError:
+                yield flush()
+                continue
+
+            if payload is _END:
+                break
+
+            content = payload.get("content")
+            if content is not None and len(payload) == 1:
+                buffer.append(content)
+                buffered += len(content)
+                if deadline is None:
+                    deadline = loop.time() + flush_interval
+                if buffered >= flush_bytes or flush_interval <= 0:
+                    yield flush()
+                continue
+
+            if buffer:
+                yield flush()
+            yield sse_event(payload)
+
+        if buffer:
+            yield flush()
+    finally:
+        producer.cancel()
@@ -0,0 +1,64 @@
+import os
+import sqlite3
+import sys
+from contextlib import contextmanager
+
+import pytest
+
+# Modules in faq_career_bot import each other as top-level modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class FakeCursor:
+    """Dictionary cursor over sqlite3 that accepts MySQL-style %s placeholders"""
+
+    def __init__(self, connection: sqlite3.Connection):
+        self._cursor = connection.cursor()
+
+    def execute(self, query, params=()):
+        self._cursor.execute(query.replace("%s", "?"), tuple(params))
+
+    def _row(self, row):
+        return {column[0]: value for column, value in zip(self._cursor.description, row)}
+
+    def fetchall(self):
+        return [self._row(row) for row in self._cursor.fetchall()]
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        return None if row is None else self._row(row)
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, connection: sqlite3.Connection):
+        self._connection = connection
+
+    def cursor(self, dictionary=False):
+        return FakeCursor(self._connection)
+
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    """In-memory Jobs/UserSkills tables served through job_matching.get_connection"""
+    import job_matching
+
+    connection = sqlite3.connect(":memory:", check_same_thread=False)
+    connection.execute(
+        "CREATE TABLE Jobs (id INTEGER PRIMARY KEY, title TEXT, company TEXT, location TEXT, "
+        "jobType TEXT, description TEXT, requiredSkills TEXT, experienceLevel TEXT, "
+        "careerTrack TEXT, updatedAt TEXT)"
+    )
+    connection.execute(
+        "CREATE TABLE UserSkills (id INTEGER PRIMARY KEY, userId INTEGER, skillName TEXT, "
+        "proficiency TEXT, updatedAt TEXT)"
+    )
+
+    @contextmanager
+    def get_connection(**config):
+        yield FakeConnection(connection)
+
+    monkeypatch.setattr(job_matching, "get_connection", get_connection)
+    return connection
@@ -0,0 +1,105 @@
+import asyncio
+import gc
+import threading
+import time
+
+import pytest
+
+from concurrency import BoundedExecutor, ExecutorBusy, iterate_in_thread
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not met in time"
+        time.sleep(0.01)
+
+
+def admits(pool):
+    try:
+        pool.submit(None, int).result()
+        return True
+    except ExecutorBusy:
+        return False
+
+
+def test_iterate_in_thread_yields_items_and_reraises():
+    def items():
+        yield 1
+        yield 2
+        raise ValueError("boom")
+
+    async def collect():
+        seen = []
+        with pytest.raises(ValueError):
+            async for item in iterate_in_thread(items()):
+                seen.append(item)
+        return seen
+
+    assert asyncio.run(collect()) == [1, 2]
+
+
+def test_stream_holds_a_slot_until_the_stream_ends():
+    pool = BoundedExecutor("test-stream", max_workers=1, max_queue=0)
+    release = threading.Event()
+
+    def items():
+        yield 1
+        release.wait(2)
+        yield 2
+
+    async def scenario():
+        stream = pool.stream(items())
+        assert await stream.__anext__() == 1
+        with pytest.raises(ExecutorBusy):
+            pool.stream(iter([]))
+        release.set()
+        assert [item async for item in stream] == [2]
+
+    asyncio.run(scenario())
+    assert pool.stats()["rejected"] == 1
+    wait_for(lambda: admits(pool))
+
+
+def test_abandoned_stream_releases_its_slot():
+    pool = BoundedExecutor("test-abandon", max_workers=1, max_queue=0)
+
+    def endless():
+        while True:
+            yield 0
+
+    async def scenario():
+        stream = pool.stream(endless(), max_buffer=1)
+        del stream
+        gc.collect()
+
+    asyncio.run(scenario())
+    wait_for(lambda: admits(pool))
+
+
+def test_streams_are_not_coalesced():
+    pool = BoundedExecutor("test-keys", max_workers=2, max_queue=0)
+
+    async def scenario():
+        first = pool.stream(iter([1]))
+        second = pool.stream(iter([2]))
+        return [item async for item in first], [item async for item in second]
+
+    assert asyncio.run(scenario()) == ([1], [2])
+    assert pool.stats()["coalesced"] == 0
+
+
+def test_stats_track_active_queued_and_completed():
+    pool = BoundedExecutor("test-stats", max_workers=1, max_queue=1)
+    release = threading.Event()
+    running = pool.submit("a", release.wait, 2)
+    waiting = pool.submit("b", int)
+    wait_for(lambda: pool.stats()["active"] == 1)
+    assert pool.stats()["queued"] == 1
+
+    release.set()
+    running.result()
+    waiting.result()
+    wait_for(lambda: pool.stats()["completed"] == 2)
+    stats = pool.stats()
+    assert (stats["active"], stats["queued"], stats["submitted"]) == (0, 0, 2)
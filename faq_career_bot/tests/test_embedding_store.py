@@ -0,0 +1,45 @@
+import json
+
+import numpy as np
+
+from embedding_store import EmbeddingStore, LocalHashEmbeddings
+
+
+def manifest_keys(store):
+    with open(store.manifest_path, encoding="utf-8") as f:
+        return json.load(f)["keys"]
+
+
+def test_unchanged_texts_are_not_re_embedded(tmp_path):
+    model = LocalHashEmbeddings(dimensions=16)
+    EmbeddingStore(str(tmp_path), model.model).get_or_embed(["a", "b"], model.embed_documents)
+
+    store = EmbeddingStore(str(tmp_path), model.model)
+    vectors = store.get_or_embed(["b", "a"], model.embed_documents)
+    assert model.documents_embedded == 2
+    assert (store.last_hits, store.last_misses) == (2, 0)
+    assert np.allclose(vectors, model.embed_documents(["b", "a"]))
+
+
+def test_prune_compacts_to_the_current_texts(tmp_path):
+    model = LocalHashEmbeddings(dimensions=16)
+    store = EmbeddingStore(str(tmp_path), model.model)
+    store.get_or_embed(["a", "b", "c"], model.embed_documents, prune=True)
+
+    # "b" removed, "c" edited into "c2"
+    vectors = store.get_or_embed(["a", "c2"], model.embed_documents, prune=True)
+    assert (store.last_hits, store.last_misses, store.last_pruned) == (1, 1, 2)
+    assert np.allclose(vectors, model.embed_documents(["a", "c2"]))
+
+    reopened = EmbeddingStore(str(tmp_path), model.model)
+    assert len(reopened) == 2
+    assert manifest_keys(reopened) == [store.key("a"), store.key("c2")]
+    assert np.load(reopened.matrix_path).shape == (2, 16)
+
+
+def test_without_prune_other_rows_are_kept(tmp_path):
+    model = LocalHashEmbeddings(dimensions=16)
+    store = EmbeddingStore(str(tmp_path), model.model)
+    store.get_or_embed(["a", "b"], model.embed_documents)
+    store.get_or_embed(["c"], model.embed_documents)
+    assert len(EmbeddingStore(str(tmp_path), model.model)) == 3
@@ -0,0 +1,72 @@
+import re
+
+import pytest
+
+from guardrails import ContentGuardrails, RuleSet, StreamingOutputFilter, _trigger_words
+
+
+def stream(chunks, overlap=200):
+    output_filter = StreamingOutputFilter(overlap=overlap)
+    text = "".join(output_filter.feed(chunk) for chunk in chunks) + output_filter.finish()
+    return text, output_filter.safe
+
+
+@pytest.mark.parametrize("chunks", [
+    ["Join a hackathon: here is how to hack", "athon prep"],
+    ["Ship the kill", "er feature first"],
+    ["Somehow to", " hack", "athons you need a team"],
+])
+def test_word_split_across_chunks_is_judged_whole(chunks):
+    text, safe = stream(chunks)
+    assert text == "".join(chunks)
+    assert safe == ContentGuardrails.check_output_safety(text)
+    assert safe
+
+
+def test_split_harmful_phrase_is_caught():
+    _, safe = stream(["Here is how to ha", "ck", " the system."])
+    assert not safe
+
+
+def test_partial_word_is_held_until_boundary():
+    output_filter = StreamingOutputFilter()
+    assert output_filter.feed("how to hack") == "how to "
+    assert output_filter.safe
+    assert output_filter.feed("athon tips") == "hackathon "
+    assert output_filter.finish() == "tips"
+    assert output_filter.safe
+
+
+def test_overlap_window_starts_on_word_boundary():
+    # "somehow" cut down to "how" would look like "how to hack"
+    _, safe = stream(["x" * 30 + " somehow", " to hack", "athon"], overlap=12)
+    assert safe
+
+
+def test_leaked_spans_removed_across_chunks():
+    text, safe = stream(["Hi [SYS", "TEM]secret[/SYS", "TEM] there"])
+    assert text == "Hi  there"
+    assert safe
+
+
+@pytest.mark.parametrize("pattern", [r'\bfoo\b|bar', r'\b(foo)\b.*x|bar'])
+def test_top_level_alternation_is_always_checked(pattern):
+    assert _trigger_words(pattern) is None
+    rules = RuleSet([pattern])
+    assert rules.search("only bar here")
+    assert rules.search("foo x")
+    assert not rules.search("nothing")
+
+
+def test_grouped_alternation_keeps_triggers():
+    assert _trigger_words(r'\b(hack|exploit)\b.*\b(system)\b') == ["hack", "exploit"]
+    assert _trigger_words(r'\bact\s+as\s+[a|b]') == ["act"]
+
+
+def test_rule_set_matches_plain_search():
+    queries = ["how do I hack the system", "pretend to be my boss", "ignore all rules", "career advice"]
+    for patterns in (ContentGuardrails.BLOCKED_PATTERNS, ContentGuardrails.OFF_TOPIC_PATTERNS):
+        rules = RuleSet(patterns)
+        for query in queries:
+            expected = any(re.search(pattern, query, re.IGNORECASE) for pattern in patterns)
+            assert rules.search(query) == expected
@@ -0,0 +1,126 @@
+import pytest
+
+from job_matching import FuzzySkillIndex, load_skill_aliases, SKILL_ALIASES
+
+
+@pytest.fixture(scope="module")
+def index():
+    return FuzzySkillIndex(SKILL_ALIASES)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("strong python 3 skills", "python"),
+    ("experience with reactjs", "react"),
+    ("react native apps", "react native"),
+    ("strong java skills", "java"),
+    ("handson docker experience", "docker"),
+    ("experienced in tableau", "tableau"),
+])
+def test_free_form_text_resolves(index, text, expected):
+    assert index.resolve(text) == expected
+
+
+@pytest.mark.parametrize("text", [
+    # Short names only match exactly or through an alias
+    "go to market strategy",
+    "let us go",
+    "ml engineer experience",
+    # Several skills in one string
+    "java and javascript",
+    "html/css",
+    "tableau or power bi",
+    "docker & kubernetes",
+    # Unrelated text
+    "good communication",
+    "strong skills",
+])
+def test_ambiguous_or_unrelated_text_stays_unresolved(index, text):
+    assert index.resolve(text) is None
+
+
+def test_threshold_above_one_disables_resolution():
+    assert FuzzySkillIndex(SKILL_ALIASES, threshold=1.1).resolve("strong python 3 skills") is None
+
+
+def test_missing_alias_file_is_empty(tmp_path):
+    assert load_skill_aliases(str(tmp_path / "missing.json")) == {}
+
+
+def put_job(db, job_id, skills, updated_at):
+    db.execute(
+        "INSERT OR REPLACE INTO Jobs (id, title, company, location, jobType, description, "
+        "requiredSkills, experienceLevel, careerTrack, updatedAt) "
+        "VALUES (?, 'Developer', 'Acme', 'Dhaka', 'Full-time', '', ?, 'Junior', 'Web', ?)",
+        (job_id, skills, updated_at)
+    )
+
+
+@pytest.fixture
+def catalog(fake_db):
+    from job_matching import JobCatalog, JobMatchingEngine
+    return JobCatalog(JobMatchingEngine(), refresh_interval=0)
+
+
+def test_catalog_sees_a_write_in_the_same_second_as_the_last_probe(fake_db, catalog):
+    put_job(fake_db, 1, "Python", "2026-01-01 00:00:01")
+    put_job(fake_db, 2, "Java", "2026-01-01 00:00:01")
+    catalog.refresh()
+
+    put_job(fake_db, 1, "Python, SQL", "2026-01-01 00:00:05")
+    catalog.refresh()
+    put_job(fake_db, 2, "Go", "2026-01-01 00:00:05")
+
+    assert catalog.refresh()
+    assert catalog._jobs[2]["requiredSkills"] == "Go"
+
+
+def test_catalog_survives_deleting_the_newest_job(fake_db, catalog):
+    put_job(fake_db, 1, "Python", "2026-01-01 00:00:01")
+    put_job(fake_db, 2, "Java", "2026-01-01 00:00:02")
+    catalog.refresh()
+
+    fake_db.execute("DELETE FROM Jobs WHERE id = 2")
+    assert catalog.refresh()
+    assert sorted(catalog._jobs) == [1]
+    assert not catalog.refresh()
+
+
+def put_skill(db, user_id, skill, proficiency, updated_at):
+    db.execute(
+        "INSERT INTO UserSkills (userId, skillName, proficiency, updatedAt) VALUES (?, ?, ?, ?)",
+        (user_id, skill, proficiency, updated_at)
+    )
+
+
+@pytest.fixture
+def engine(fake_db, catalog):
+    from job_matching import JobMatchingEngine
+    engine = JobMatchingEngine()
+    engine.job_catalog = catalog
+    catalog.engine = engine
+    return engine
+
+
+def test_cached_matches_follow_skill_edits_without_invalidation(fake_db, engine):
+    put_job(fake_db, 1, "Python", "2026-01-01 00:00:01")
+    put_job(fake_db, 2, "Java", "2026-01-01 00:00:01")
+    put_skill(fake_db, 7, "Python", "Advanced", "2026-01-01 00:00:01")
+
+    first = engine.get_json_output(7)
+    assert engine.get_json_output(7) is first
+
+    put_skill(fake_db, 7, "Java", "Expert", "2026-01-01 00:00:01")
+    second = engine.get_json_output(7)
+    assert second is not first
+    assert engine.get_json_output(7) is second
+
+    fake_db.execute("UPDATE UserSkills SET proficiency = 'Beginner', updatedAt = '2026-01-01 00:00:09' "
+                    "WHERE skillName = 'Java'")
+    assert engine.get_json_output(7) is not second
+
+
+def test_user_skill_versions_cover_users_without_skills(fake_db, engine):
+    put_skill(fake_db, 7, "Python", "Advanced", "2026-01-01 00:00:01")
+    versions = engine.get_user_skill_versions([7, 8])
+    assert versions[7][0] == 1
+    assert versions[8] == (0, None, None)
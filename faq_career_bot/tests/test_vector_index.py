@@ -0,0 +1,19 @@
+import numpy as np
+import pytest
+
+from vector_index import ExactIndex, VectorIndex
+
+
+def test_incomplete_backend_fails_at_construction():
+    class NoSearch(VectorIndex):
+        kind = "broken"
+
+    with pytest.raises(TypeError):
+        NoSearch(np.zeros((1, 2), dtype=np.float32))
+
+
+def test_exact_index_returns_best_match_first():
+    vectors = np.eye(3, dtype=np.float32)
+    results = ExactIndex(vectors).search(vectors[[2]], top_k=2)
+    assert results[0][0] == (2, pytest.approx(1.0))
+    assert len(results[0]) == 2
@@ -0,0 +1,276 @@
+"""
+Vector indexes for knowledge base retrieval
+
+All indexes search unit-length float32 vectors by inner product (cosine
+similarity) and share the same interface, so the retrieval code does not
+care which backend is in use:
+
+    ExactIndex  - brute-force matrix product; perfect recall, O(N) per query
+    IVFIndex    - inverted-file ANN index; k-means partitions the vectors into
+                  n_lists cells and a query only scans the n_probe closest
+                  cells. Raise n_probe for higher recall@k, lower it for speed.
+
+Settings (environment variables):
+    VECTOR_INDEX           - exact, ivf or auto (default auto: ivf from
+                             VECTOR_INDEX_IVF_MIN_SIZE vectors upward)
+    VECTOR_INDEX_IVF_MIN_SIZE - corpus size at which auto switches to IVF (default 20000)
+    VECTOR_INDEX_NLIST     - IVF cell count (default ~4*sqrt(N))
+    VECTOR_INDEX_NPROBE    - IVF cells scanned per query (default 8)
+"""
+
+import os
+import tempfile
+from abc import ABC, abstractmethod
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+
+SearchResults = List[List[Tuple[int, float]]]
+
+
+def _top_k(scores: np.ndarray, ids: np.ndarray, top_k: int) -> List[Tuple[int, float]]:
+    """Best top_k (id, score) pairs of one score row, best first"""
+    if top_k < len(scores):
+        selected = np.argpartition(-scores, top_k - 1)[:top_k]
+    else:
+        selected = np.arange(len(scores))
+    selected = selected[np.argsort(-scores[selected], kind="stable")]
+    return [(int(ids[i]), float(scores[i])) for i in selected]
+
+
+class VectorIndex(ABC):
+    """Interface shared by all vector index backends"""
+
+    kind = "base"
+
+    def __init__(self, vectors: np.ndarray):
+        """
+        Args:
+            vectors: (N, dim) unit-length float32 matrix; row i is item i
+        """
+        self.vectors = vectors
+
+    def __len__(self) -> int:
+        return len(self.vectors)
+
+    @abstractmethod
+    def search(self, query_vectors: np.ndarray, top_k: int) -> SearchResults:
+        """
+        Find the items most similar to each query vector
+
+        Returns:
+            Per query, a list of (item index, cosine similarity), best first
+        """
+
+    def save(self, path: str):
+        """Persist the index structure (vectors are stored by the embedding cache)"""
+
+    def stats(self) -> dict:
+        return {"kind": self.kind, "size": len(self)}
+
+
+class ExactIndex(VectorIndex):
+    """Brute-force inner product over every vector"""
+
+    kind = "exact"
+
+    def search(self, query_vectors: np.ndarray, top_k: int) -> SearchResults:
+        top_k = min(top_k, len(self.vectors))
+        if top_k <= 0:
+            return [[] for _ in range(len(query_vectors))]
+
+        # Rows are unit length, so the dot product is the cosine similarity
+        similarities = query_vectors @ self.vectors.T
+        ids = np.arange(len(self.vectors))
+        return [_top_k(row, ids, top_k) for row in similarities]
+
+
+class IVFIndex(VectorIndex):
+    """Inverted-file index: spherical k-means cells, n_probe cells scanned per query"""
+
+    kind = "ivf"
+
+    def __init__(self, vectors: np.ndarray, n_lists: Optional[int] = None, n_probe: int = 8,
+                 centroids: Optional[np.ndarray] = None, order: Optional[np.ndarray] = None,
+                 offsets: Optional[np.ndarray] = None, fingerprint: str = "", seed: int = 0):
+        """
+        Build the index, or wrap a previously built structure
+
+        Args:
+            vectors: (N, dim) unit-length float32 matrix
+            n_lists: Number of k-means cells (default ~4*sqrt(N))
+            n_probe: Cells scanned per query; trades speed for recall@k
+            centroids, order, offsets: Structure loaded from disk
+            fingerprint: Identifies the vector set the structure was built for
+            seed: k-means seed
+        """
+        super().__init__(vectors)
+        self.n_probe = n_probe
+        self.fingerprint = fingerprint
+
+        if centroids is None:
+            n_lists = n_lists or max(1, int(4 * np.sqrt(len(vectors))))
+            n_lists = max(1, min(n_lists, len(vectors)))
+            centroids, order, offsets = self._train(vectors, n_lists, seed)
+
+        self.centroids = centroids
+        # Item ids grouped by cell: cell c holds order[offsets[c]:offsets[c + 1]]
+        self.order = order
+        self.offsets = offsets
+
+    @property
+    def n_lists(self) -> int:
+        return len(self.centroids)
+
+    @staticmethod
+    def _train(vectors: np.ndarray, n_lists: int, seed: int, iterations: int = 10,
+               sample_per_list: int = 64) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Spherical k-means on a sample, then assign every vector to its closest cell"""
+        rng = np.random.default_rng(seed)
+        sample_size = min(len(vectors), n_lists * sample_per_list)
+        sample = vectors[rng.choice(len(vectors), sample_size, replace=False)]
+
+        centroids = sample[rng.choice(len(sample), n_lists, replace=False)].copy()
+        for _ in range(iterations):
+            assignment = np.argmax(sample @ centroids.T, axis=1)
+            # Per-cell sums via one sort + segmented reduction (np.add.at is far slower)
+            order = np.argsort(assignment, kind="stable")
+            counts = np.bincount(assignment, minlength=n_lists)
+            sums = np.zeros_like(centroids)
+            filled = counts > 0
+            starts = np.concatenate(([0], np.cumsum(counts)[:-1]))[filled]
+            sums[filled] = np.add.reduceat(sample[order], starts, axis=0)
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            empty = norms[:, 0] == 0
+            # Re-seed empty cells with random sample points
+            sums[empty] = sample[rng.choice(len(sample), int(empty.sum()))]
+            norms[empty] = 1.0
+            centroids = (sums / norms).astype(np.float32)
+
+        assignment = np.empty(len(vectors), dtype=np.int32)
+        for start in range(0, len(vectors), 65536):
+            block = vectors[start:start + 65536]
+            assignment[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+
+        order = np.argsort(assignment, kind="stable").astype(np.int32)
+        offsets = np.zeros(n_lists + 1, dtype=np.int64)
+        np.cumsum(np.bincount(assignment, minlength=n_lists), out=offsets[1:])
+        return np.ascontiguousarray(centroids), order, offsets
+
+    def search(self, query_vectors: np.ndarray, top_k: int, n_probe: Optional[int] = None) -> SearchResults:
+        n_probe = min(n_probe or self.n_probe, self.n_lists)
+        if top_k <= 0 or not len(self.vectors):
+            return [[] for _ in range(len(query_vectors))]
+
+        cell_scores = query_vectors @ self.centroids.T
+        if n_probe < self.n_lists:
+            probes = np.argpartition(-cell_scores, n_probe - 1, axis=1)[:, :n_probe]
+        else:
+            probes = np.tile(np.arange(self.n_lists), (len(query_vectors), 1))
+
+        results = []
+        for query, cells in zip(query_vectors, probes):
+            candidates = np.concatenate(
+                [self.order[self.offsets[c]:self.offsets[c + 1]] for c in cells]
+            )
+            if not len(candidates):
+                results.append([])
+                continue
+            # Keep candidate ids ascending so ties break the same way as ExactIndex
+            candidates.sort()
+            scores = self.vectors[candidates] @ query
+            results.append(_top_k(scores, candidates, min(top_k, len(candidates))))
+        return results
+
+    def save(self, path: str):
+        """Atomically write the cell structure to an .npz file"""
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".npz")
+        with os.fdopen(fd, 'wb') as f:
+            np.savez(f, centroids=self.centroids, order=self.order, offsets=self.offsets,
+                     fingerprint=np.array(self.fingerprint))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str, vectors: np.ndarray, fingerprint: str, n_lists: Optional[int] = None,
+             n_probe: int = 8) -> Optional['IVFIndex']:
+        """
+        Load a saved structure if it was built for these vectors
+
+        Returns:
+            The index, or None if the file is missing, unreadable or stale
+        """
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                if str(data["fingerprint"]) != fingerprint:
+                    return None
+                centroids = data["centroids"]
+                if n_lists and len(centroids) != n_lists:
+                    return None
+                return cls(vectors, n_probe=n_probe, centroids=centroids, order=data["order"],
+                           offsets=data["offsets"], fingerprint=fingerprint)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"⚠️ Ignoring unreadable vector index at {path}: {e}")
+            return None
+
+    def stats(self) -> dict:
+        sizes = np.diff(self.offsets)
+        return {
+            "kind": self.kind,
+            "size": len(self),
+            "n_lists": self.n_lists,
+            "n_probe": self.n_probe,
+            "largest_list": int(sizes.max()) if len(sizes) else 0
+        }
+
+
+def recall_at_k(index: VectorIndex, query_vectors: np.ndarray, top_k: int = 10) -> float:
+    """
+    Fraction of the exact top_k results that the index also returns
+
+    Useful for tuning IVF n_probe against a sample of real queries.
+    """
+    exact = ExactIndex(index.vectors).search(query_vectors, top_k)
+    approximate = index.search(query_vectors, top_k)
+    found = expected = 0
+    for truth, result in zip(exact, approximate):
+        truth_ids = {idx for idx, _ in truth}
+        found += len(truth_ids & {idx for idx, _ in result})
+        expected += len(truth_ids)
+    return found / expected if expected else 1.0
+
+
+def build_vector_index(vectors: np.ndarray, fingerprint: str, cache_dir: Optional[str] = None,
+                       kind: Optional[str] = None) -> VectorIndex:
+    """
+    Create the configured index, reusing a persisted IVF structure when valid
+
+    Args:
+        vectors: (N, dim) unit-length float32 matrix
+        fingerprint: Identifies the vector set (e.g. hash of the chunk cache keys)
+        cache_dir: Directory to persist the IVF structure in
+        kind: exact, ivf or auto (defaults to VECTOR_INDEX)
+    """
+    kind = (kind or os.getenv("VECTOR_INDEX", "auto")).lower()
+    if kind == "auto":
+        min_size = int(os.getenv("VECTOR_INDEX_IVF_MIN_SIZE", "20000"))
+        kind = "ivf" if len(vectors) >= min_size else "exact"
+
+    if kind != "ivf" or not len(vectors):
+        return ExactIndex(vectors)
+
+    n_lists = int(os.getenv("VECTOR_INDEX_NLIST", "0")) or None
+    n_probe = int(os.getenv("VECTOR_INDEX_NPROBE", "8"))
+    path = os.path.join(cache_dir, "ivf_index.npz") if cache_dir else None
+
+    index = IVFIndex.load(path, vectors, fingerprint, n_lists, n_probe) if path else None
+    if index is None:
+        print(f"🧭 Building IVF vector index over {len(vectors)} vectors...")
+        index = IVFIndex(vectors, n_lists=n_lists, n_probe=n_probe, fingerprint=fingerprint)
+        if path:
+            index.save(path)
+    return index